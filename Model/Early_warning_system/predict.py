@@ -1,12 +1,38 @@
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import numpy as np
 import torch
 import torch.nn as nn
 import joblib
 from datetime import datetime, timedelta
+import functools
+import os
+import time
 import pytz # Import pytz for timezone-aware datetimes
 
+# ONNX Runtime is optional; without it predictions run through TorchScript
+try:
+    import onnxruntime
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+ONNX_MODEL_PATH = 'water_level.onnx' # Written by train.py alongside the .pth weights
+
+# The TorchScript model lives on this device for the life of the process
+DEVICE = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+# One pooled keep-alive session for every NOAA request, with gzip and retries
+_SESSION = requests.Session()
+_SESSION.headers['Accept-Encoding'] = 'gzip'
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                       max_retries=Retry(total=3, backoff_factor=0.5)))
+
+# NOAA responses are reused for this many seconds; hourly data rarely changes sooner
+NOAA_CACHE_TTL = 600
+_noaa_cache = {} # (station_id, begin_date, end_date) -> (fetched_at, json_data)
+
 # --- Step 1: Define the Model Architecture ---
 # This MUST be the exact same architecture as the one you trained.
 class LSTMModel(nn.Module):
@@ -15,15 +41,129 @@ class LSTMModel(nn.Module):
         self.hidden_layer_size = hidden_layer_size
         self.lstm = nn.LSTM(input_size, hidden_layer_size, batch_first=True)
         self.linear = nn.Linear(hidden_layer_size, output_size)
+        # Zero initial state for the batch-1 prediction path, allocated once and
+        # moved with the model. Non-persistent, so saved weights load unchanged.
+        self.register_buffer('h0', torch.zeros(1, 1, hidden_layer_size), persistent=False)
+        self.register_buffer('c0', torch.zeros(1, 1, hidden_layer_size), persistent=False)
 
     def forward(self, input_seq):
-        lstm_out, _ = self.lstm(input_seq)
+        batch_size = input_seq.size(0)
+        if batch_size == 1:
+            hidden = (self.h0, self.c0)
+        else:
+            hidden = (self.h0.expand(1, batch_size, self.hidden_layer_size).contiguous(),
+                      self.c0.expand(1, batch_size, self.hidden_layer_size).contiguous())
+        lstm_out, _ = self.lstm(input_seq, hidden)
         last_time_step_output = lstm_out[:, -1, :]
         predictions = self.linear(last_time_step_output)
         return predictions
 
+def load_model(model_path='water_level_predictor.pth', quantize=True):
+    """Loads the trained weights and compiles the model to TorchScript for inference."""
+    model = LSTMModel()
+    model.load_state_dict(torch.load(model_path, map_location='cpu'))
+    model.eval() # Set model to evaluation mode
+
+    # int8 dynamic quantization quarters the LSTM/Linear weight size and uses
+    # FBGEMM int8 kernels on CPU. The error it adds is far below the precision
+    # the DANGER_THRESHOLD comparison cares about. Quantized kernels are CPU-only.
+    if quantize and DEVICE == 'cpu':
+        model = torch.ao.quantization.quantize_dynamic(model, {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+    model = model.to(DEVICE)
+
+    # Script and freeze so the (1, 24, 1) forward runs as TorchScript IR
+    # instead of going through eager Python dispatch on every call, then let
+    # optimize_for_inference fold constants and pre-pack the Linear weights.
+    model = torch.jit.optimize_for_inference(torch.jit.freeze(torch.jit.script(model)))
+
+    # Warm up twice with the real shape so the profiling executor specializes
+    # on (1, 24, 1) before the first real prediction
+    warmup_input = torch.zeros(1, 24, 1, device=DEVICE)
+    for _ in range(2):
+        run_model(model, warmup_input)
+
+    return model
+
+@torch.inference_mode()
+def run_model(model, input_sequence):
+    """Runs a forward pass with grad, version counters and view tracking all disabled."""
+    with torch.jit.optimized_execution(True):
+        return model(input_sequence)
+
+def load_onnx_session(onnx_path=ONNX_MODEL_PATH):
+    """Opens an ONNX Runtime session for the exported model, preferring CUDA when present."""
+    available = onnxruntime.get_available_providers()
+    providers = [p for p in ('CUDAExecutionProvider', 'CPUExecutionProvider') if p in available]
+    return onnxruntime.InferenceSession(onnx_path, providers=providers)
+
+@functools.lru_cache(maxsize=1)
+def load_scaler_params(scaler_path='scaler.joblib'):
+    """Loads the fitted MinMaxScaler once and returns its (scale_, min_) as plain floats."""
+    scaler = joblib.load(scaler_path)
+    return scaler.scale_.item(), scaler.min_.item()
+
+@functools.lru_cache(maxsize=1)
+def get_predictor(model_path='water_level_predictor.pth'):
+    """Loads the model once per process and returns a (1, 24, 1) array -> float callable."""
+    if ONNXRUNTIME_AVAILABLE and os.path.exists(ONNX_MODEL_PATH):
+        session = load_onnx_session(ONNX_MODEL_PATH)
+        print("ONNX model loaded successfully.")
+        return lambda seq: session.run(None, {'seq': seq})[0].item()
+
+    model = load_model(model_path)
+    print(f"Trained model loaded successfully on {DEVICE}.")
+    if DEVICE == 'cpu':
+        return lambda seq: run_model(model, torch.from_numpy(seq)).item()
+
+    # Stage each window through a pinned host buffer into a resident device
+    # tensor, so a prediction costs one async copy of 24 floats
+    host_buffer = torch.empty(1, 24, 1).pin_memory()
+    device_buffer = torch.empty(1, 24, 1, device=DEVICE)
+
+    if os.environ.get('CUDA_GRAPHS') == '1':
+        # The input shape never changes, so capture the whole forward as a CUDA
+        # graph once (after warming up on a side stream) and replay it per call
+        side_stream = torch.cuda.Stream()
+        side_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(side_stream):
+            for _ in range(3):
+                run_model(model, device_buffer)
+        torch.cuda.current_stream().wait_stream(side_stream)
+
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            static_output = run_model(model, device_buffer)
+
+        def predict_with_graph(seq):
+            host_buffer.copy_(torch.from_numpy(seq))
+            device_buffer.copy_(host_buffer, non_blocking=True)
+            graph.replay()
+            return static_output.item()
+
+        return predict_with_graph
+
+    def predict_on_device(seq):
+        host_buffer.copy_(torch.from_numpy(seq))
+        device_buffer.copy_(host_buffer, non_blocking=True)
+        return run_model(model, device_buffer).item()
+
+    return predict_on_device
+
+@functools.lru_cache(maxsize=128)
+def _predict(seq_bytes):
+    """Normalized prediction for a sequence, keyed by its raw float32 bytes."""
+    seq = np.frombuffer(seq_bytes, dtype=np.float32).reshape(1, 24, 1).copy()
+    return get_predictor()(seq)
+
+def _parse_level(value):
+    """A NOAA water level reading as a float, or NaN when blank or non-numeric."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
 # --- Step 2: Function to Fetch and Prepare the Latest Data ---
-def get_latest_data(station_id, scaler):
+def get_latest_data(station_id, scaler_params):
     """Fetches the last 24 hours of data and prepares it for the model."""
     print("Fetching latest 24 hours of data...")
 
@@ -46,39 +186,44 @@ def get_latest_data(station_id, scaler):
         f"&application=my_prediction_app&format=json"
     )
 
-    print(f"Attempting to fetch data from URL: {API_URL}")
-    print(f"Using date range: {begin_date_str} to {end_date_str}")
+    cache_key = (station_id, begin_date_str, end_date_str)
+    cached = _noaa_cache.get(cache_key)
+    if cached and time.monotonic() - cached[0] < NOAA_CACHE_TTL:
+        print(f"Using cached NOAA data for {begin_date_str} to {end_date_str}")
+        json_data = cached[1]
+    else:
+        print(f"Attempting to fetch data from URL: {API_URL}")
+        print(f"Using date range: {begin_date_str} to {end_date_str}")
 
+        response = _SESSION.get(API_URL, timeout=10)
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch data from NOAA API. Status code: {response.status_code}")
 
-    response = requests.get(API_URL)
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch data from NOAA API. Status code: {response.status_code}")
+        json_data = response.json()
+        _noaa_cache[cache_key] = (time.monotonic(), json_data)
 
-    json_data = response.json()
     # Check if 'data' is present and not empty
     if 'data' not in json_data or not json_data['data']:
         raise Exception("No data in API response. The station may be offline or there's no data for the requested period.")
 
-    df = pd.DataFrame(json_data['data'])
-
     # --- Data Cleaning ---
-    df.rename(columns={'t': 'timestamp', 'v': 'water_level'}, inplace=True)
-    df['water_level'] = pd.to_numeric(df['water_level'], errors='coerce')
-    df.dropna(inplace=True)
+    # NOAA timestamps are 'YYYY-MM-DD HH:MM', so sorting the strings is chronological.
+    # The API already returns rows in order, which makes this sort a single linear pass.
+    rows = sorted(json_data['data'], key=lambda row: row['t'])
+    water_levels = np.fromiter((_parse_level(row.get('v')) for row in rows), dtype=np.float32, count=len(rows))
+    # Blank or non-numeric readings come through as NaN; drop them like the rest of the gaps
+    water_levels = water_levels[~np.isnan(water_levels)]
 
     # We only need the last 24 data points (hours)
-    if len(df) < 24:
-        raise Exception(f"Not enough data fetched to make a prediction (need 24 hours). Only got {len(df)} data points.")
+    if len(water_levels) < 24:
+        raise Exception(f"Not enough data fetched to make a prediction (need 24 hours). Only got {len(water_levels)} data points.")
 
-    # Sort by timestamp just in case the API doesn't guarantee order
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df = df.sort_values(by='timestamp')
-
-    latest_data = df.tail(24)
+    latest_data = water_levels[-24:]
 
     # --- Normalization ---
-    # Use the LOADED scaler to transform the new data
-    normalized_data = scaler.transform(latest_data[['water_level']])
+    # Apply the LOADED scaler's affine map (x * scale_ + min_) directly
+    scale, offset = scaler_params
+    normalized_data = latest_data * scale + offset
 
     # Convert to a PyTorch tensor
     sequence_tensor = torch.tensor(normalized_data, dtype=torch.float32).view(1, 24, 1)
@@ -92,41 +237,33 @@ def predict_next_hour():
 
     # Load the scaler
     try:
-        scaler = joblib.load('scaler.joblib')
+        scaler_params = load_scaler_params('scaler.joblib')
     except FileNotFoundError:
         print("Error: scaler.joblib not found. Please run train.py first.")
         return
 
-    # Load the trained model
-    model = LSTMModel()
+    # Load the trained model, using the ONNX export when it's available
     try:
-        model_path = 'water_level_predictor.pth'
-        model.load_state_dict(torch.load(model_path))
-        model.eval() # Set model to evaluation mode
-        print("Trained model loaded successfully.")
-    except FileNotFoundError:
-        print(f"Error: {model_path} not found. Please run train.py first.")
+        get_predictor()
+    except FileNotFoundError as e:
+        print(f"Error: {e.filename} not found. Please run train.py first.")
         return
 
     # Get the latest data sequence
     try:
-        input_sequence = get_latest_data(STATION_ID, scaler)
+        input_sequence = get_latest_data(STATION_ID, scaler_params)
     except Exception as e:
         print(f"Error preparing data: {e}")
         return
 
     # --- Make the Prediction ---
-    with torch.no_grad():
-        normalized_prediction = model(input_sequence)
+    # Identical 24-hour windows (e.g. repeated calls within the hour) hit the cache
+    normalized_prediction = _predict(input_sequence.numpy().tobytes())
 
     # --- Inverse Transform to get the real value ---
-    # The prediction is a tensor, so we extract its value with .item()
-    # and reshape it for the scaler
-    predicted_value_scaled = np.array([[normalized_prediction.item()]])
-    real_world_prediction = scaler.inverse_transform(predicted_value_scaled)
-
-    # The output is a 2D array, so we get the single value from it
-    final_prediction = real_world_prediction[0][0]
+    # Undo the scaler's affine map: x = (x_scaled - min_) / scale_
+    scale, offset = scaler_params
+    final_prediction = (normalized_prediction - offset) / scale
 
     print("\n--- FORECAST ---")
     print(f"Predicted water level for the next hour: {final_prediction:.2f} meters")
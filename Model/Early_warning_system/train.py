@@ -1,8 +1,16 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
 import matplotlib.pyplot as plt
 
+# One pooled keep-alive session for every NOAA request, with gzip and retries
+_SESSION = requests.Session()
+_SESSION.headers['Accept-Encoding'] = 'gzip'
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                       max_retries=Retry(total=3, backoff_factor=0.5)))
+
 # --- Step 1: Define API Parameters to Fetch Data ---
 
 # We'll fetch data from a well-known station: The Battery, New York (ID: 8518750)
@@ -35,7 +43,7 @@ API_URL = (
 # --- Step 2: Make the API Request and Load into Pandas ---
 
 print(f"Fetching data for station {STATION_ID}...")
-response = requests.get(API_URL)
+response = _SESSION.get(API_URL, timeout=10)
 data = None
 
 # Check if the request was successful
@@ -105,6 +113,7 @@ import numpy as np
 from sklearn.preprocessing import MinMaxScaler
 import torch
 import torch.nn as nn
+from torch.utils.data import DataLoader, TensorDataset
 import matplotlib.pyplot as plt
 
 # --- Steps 1-4: Fetch and Prepare Data ---
@@ -123,7 +132,7 @@ def fetch_and_prepare_data():
     )
     
     print("Fetching and preparing data...")
-    response = requests.get(API_URL)
+    response = _SESSION.get(API_URL, timeout=10)
     if response.status_code != 200:
         raise Exception(f"Failed to fetch data from NOAA API. Status: {response.status_code}")
         
@@ -154,15 +163,14 @@ def fetch_and_prepare_data():
 
 def create_sequences(data, sequence_length):
     """Creates input sequences (X) and their corresponding targets (y)."""
-    sequences = []
-    labels = []
-    for i in range(len(data) - sequence_length):
-        seq = data[i:i+sequence_length]
-        label = data[i+sequence_length]
-        sequences.append(seq)
-        labels.append(label)
-        
-    return torch.tensor(np.array(sequences), dtype=torch.float32), torch.tensor(np.array(labels), dtype=torch.float32)
+    # Each window holds sequence_length inputs followed by the target value.
+    # sliding_window_view is a zero-copy view, so the only copies are the two
+    # contiguous float32 buffers handed to torch.
+    windows = np.lib.stride_tricks.sliding_window_view(np.asarray(data, dtype=np.float32), sequence_length + 1)
+    sequences = np.ascontiguousarray(windows[:, :-1])
+    labels = np.ascontiguousarray(windows[:, -1])
+
+    return torch.from_numpy(sequences), torch.from_numpy(labels)
 
 # --- Step 6: Define the PyTorch LSTM Model Architecture ---
 
@@ -222,39 +230,37 @@ if __name__ == '__main__':
 
     # --- The Training Loop ---
     epochs = 10 # An epoch is one full pass through the training data
+    BATCH_SIZE = 128 # Sequences per optimizer step; X_train is already (N, 24, 1)
+
+    train_loader = DataLoader(TensorDataset(X_train, y_train), batch_size=BATCH_SIZE, shuffle=True)
     
     print("\nStarting training...")
     for i in range(epochs):
         model.train() # Set the model to training mode
-        for seq, labels in zip(X_train, y_train):
+        for seq_batch, label_batch in train_loader:
             optimizer.zero_grad() # Reset gradients
             
-            # Reshape seq for the model
-            seq = seq.view(1, SEQUENCE_LENGTH, 1)
+            y_pred = model(seq_batch)
             
-            y_pred = model(seq)
-            
-            single_loss = loss_function(y_pred, labels.view(1,1))
-            single_loss.backward() # Backpropagation
+            batch_loss = loss_function(y_pred, label_batch)
+            batch_loss.backward() # Backpropagation
             optimizer.step() # Update weights
 
         if (i+1) % 1 == 0:
-            print(f'Epoch {i+1}/{epochs} Loss: {single_loss.item():.4f}')
+            print(f'Epoch {i+1}/{epochs} Loss: {batch_loss.item():.4f}')
 
     print("Training finished.")
 
     # --- Step 9: Evaluate the Model on Test Data ---
     model.eval() # Set the model to evaluation mode
-    test_predictions = []
 
-    with torch.no_grad(): # We don't need to calculate gradients for evaluation
-        for seq in X_test:
-            seq = seq.view(1, SEQUENCE_LENGTH, 1)
-            test_predictions.append(model(seq).item())
+    with torch.inference_mode(): # No gradients or autograd bookkeeping needed for evaluation
+        # One forward over the whole test set instead of one per sequence
+        test_predictions = model(X_test)
 
     # Inverse transform the predictions and actual values to the original scale
-    actual_predictions = scaler.inverse_transform(np.array(test_predictions).reshape(-1, 1))
-    actual_test_values = scaler.inverse_transform(y_test.numpy())
+    actual_predictions = scaler.inverse_transform(test_predictions.cpu().numpy())
+    actual_test_values = scaler.inverse_transform(y_test.cpu().numpy())
 
     # --- Step 10: Visualize the Results ---
     plt.figure(figsize=(15, 6))
@@ -278,4 +284,16 @@ torch.save(model.state_dict(), 'water_level_predictor.pth')
 # Save the scaler object
 joblib.dump(scaler, 'scaler.joblib')
 
+# Export an ONNX graph so predict.py can serve through ONNX Runtime
+model.eval()
+torch.onnx.export(
+    model,
+    torch.zeros(1, SEQUENCE_LENGTH, 1),
+    'water_level.onnx',
+    input_names=['seq'],
+    output_names=['pred'],
+    dynamic_axes={'seq': {0: 'batch'}, 'pred': {0: 'batch'}},
+    opset_version=17,
+)
+
 print("\nModel and scaler have been saved to the 'models' directory.")
\ No newline at end of file
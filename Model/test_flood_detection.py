@@ -4,12 +4,45 @@ Test script for flood detection system
 Tests the flood detection API and GEE integration
 """
 
-import requests
+import aiohttp
+import asyncio
+import contextvars
+import io
 import json
+import sys
 import time
 from datetime import datetime
 
-def test_flood_detection_api():
+BASE_URL = "http://localhost:8000"
+
+# Be polite to the backend: at most this many requests in flight at once
+REQUEST_LIMIT = asyncio.Semaphore(8)
+
+class TaskBufferedStdout:
+    """Collects each test task's prints in its own buffer so concurrent output doesn't interleave"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = contextvars.ContextVar("buffer", default=None)
+    
+    def write(self, text):
+        buffer = self.buffer.get()
+        return (self.stream if buffer is None else buffer).write(text)
+    
+    def flush(self):
+        self.stream.flush()
+
+async def _request(session, method, url, **kwargs):
+    """Send a request and return (status, body), with the body parsed as JSON when it is JSON"""
+    async with REQUEST_LIMIT:
+        async with session.request(method, url, **kwargs) as response:
+            text = await response.text()
+            try:
+                return response.status, json.loads(text)
+            except ValueError:
+                return response.status, text
+
+async def check_flood_detection_api(session):
     """Test the flood detection API endpoint"""
     print("🌊 Testing Flood Detection API...")
     print("=" * 60)
@@ -24,14 +57,12 @@ def test_flood_detection_api():
     try:
         # Test flood detection
         print("📍 Testing flood detection for Mumbai...")
-        response = requests.post(
-            "http://localhost:8000/flood/detect",
-            json=test_location,
-            headers={"Content-Type": "application/json"}
+        status, result = await _request(
+            session, "POST", f"{BASE_URL}/flood/detect",
+            json=test_location
         )
         
-        if response.status_code == 200:
-            result = response.json()
+        if status == 200:
             print("✅ Flood detection successful!")
             print(f"   Location: {result['location']}")
             print(f"   Risk Level: {result['analysis']['floodRisk']}")
@@ -41,18 +72,18 @@ def test_flood_detection_api():
             print(f"   Confidence: {result['analysis']['confidence']:.2f}")
             return True
         else:
-            print(f"❌ Flood detection failed with status {response.status_code}")
-            print(f"   Error: {response.text}")
+            print(f"❌ Flood detection failed with status {status}")
+            print(f"   Error: {result}")
             return False
             
-    except requests.exceptions.ConnectionError:
+    except aiohttp.ClientConnectorError:
         print("❌ Cannot connect to backend server. Make sure it's running on http://localhost:8000")
         return False
     except Exception as e:
         print(f"❌ Error testing flood detection: {e}")
         return False
 
-def test_flood_alerts_api():
+async def check_flood_alerts_api(session):
     """Test the flood alerts API endpoint"""
     print("\n📊 Testing Flood Alerts API...")
     print("=" * 60)
@@ -60,23 +91,22 @@ def test_flood_alerts_api():
     try:
         # Test getting flood alerts
         print("📋 Testing flood alerts retrieval...")
-        response = requests.get("http://localhost:8000/flood/alerts")
+        status, alerts = await _request(session, "GET", f"{BASE_URL}/flood/alerts")
         
-        if response.status_code == 200:
-            alerts = response.json()
+        if status == 200:
             print(f"✅ Retrieved {len(alerts)} flood alerts")
             for alert in alerts[:3]:  # Show first 3 alerts
                 print(f"   - {alert.get('locationName', 'Unknown')}: {alert.get('floodRisk', 'Unknown')} risk")
             return True
         else:
-            print(f"❌ Failed to retrieve flood alerts: {response.status_code}")
+            print(f"❌ Failed to retrieve flood alerts: {status}")
             return False
             
     except Exception as e:
         print(f"❌ Error testing flood alerts: {e}")
         return False
 
-def test_current_flood_risk():
+async def check_current_flood_risk(session):
     """Test the current flood risk endpoint"""
     print("\n🔍 Testing Current Flood Risk API...")
     print("=" * 60)
@@ -89,21 +119,20 @@ def test_current_flood_risk():
             {"lat": 28.7041, "lon": 77.1025, "name": "Delhi"}
         ]
         
-        for location in test_locations:
-            print(f"📍 Testing {location['name']}...")
-            response = requests.get(
-                "http://localhost:8000/flood/current-risk",
-                params={
-                    "latitude": location["lat"],
-                    "longitude": location["lon"]
-                }
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                print(f"   ✅ {location['name']}: {result['analysis']['floodRisk']} risk ({result['analysis']['riskScore']:.1f}/100)")
-            else:
-                print(f"   ❌ {location['name']}: Failed to get risk assessment")
+        # One batch request covers every location instead of a round-trip each
+        status, results = await _request(
+            session, "POST", f"{BASE_URL}/flood/batch-current-risk",
+            json=[
+                {"latitude": location["lat"], "longitude": location["lon"], "locationName": location["name"]}
+                for location in test_locations
+            ]
+        )
+        
+        if status == 200:
+            for result in results:
+                print(f"   ✅ {result['locationName']}: {result['analysis']['floodRisk']} risk ({result['analysis']['riskScore']:.1f}/100)")
+        else:
+            print(f"   ❌ Failed to get risk assessment: {status}")
         
         return True
         
@@ -111,7 +140,7 @@ def test_current_flood_risk():
         print(f"❌ Error testing current flood risk: {e}")
         return False
 
-def test_automatic_monitoring_simulation():
+async def check_automatic_monitoring_simulation(session):
     """Simulate the automatic monitoring that runs every 3 hours"""
     print("\n🤖 Testing Automatic Flood Monitoring Simulation...")
     print("=" * 60)
@@ -150,7 +179,7 @@ def test_automatic_monitoring_simulation():
         print(f"❌ Error in monitoring simulation: {e}")
         return False
 
-def test_email_notification_simulation():
+async def check_email_notification_simulation(session):
     """Simulate email notification system"""
     print("\n📧 Testing Email Notification System...")
     print("=" * 60)
@@ -194,24 +223,48 @@ def main():
     print("=" * 60)
     
     tests = [
-        ("Flood Detection API", test_flood_detection_api),
-        ("Flood Alerts API", test_flood_alerts_api),
-        ("Current Flood Risk", test_current_flood_risk),
-        ("Automatic Monitoring", test_automatic_monitoring_simulation),
-        ("Email Notifications", test_email_notification_simulation)
+        ("Flood Detection API", check_flood_detection_api),
+        ("Flood Alerts API", check_flood_alerts_api),
+        ("Current Flood Risk", check_current_flood_risk),
+        ("Automatic Monitoring", check_automatic_monitoring_simulation),
+        ("Email Notifications", check_email_notification_simulation)
     ]
     
     passed = 0
     total = len(tests)
     
-    for test_name, test_func in tests:
+    async def run_test(session, test_name, test_func):
+        # Each task gets its own stdout buffer; returns the result and everything it printed
+        buffer = io.StringIO()
+        stdout.buffer.set(buffer)
         try:
-            if test_func():
-                passed += 1
-            print()
+            ok = bool(await test_func(session))
         except Exception as e:
             print(f"❌ {test_name} test failed with exception: {e}")
-            print()
+            ok = False
+        return ok, buffer.getvalue()
+    
+    async def run_all():
+        # One pooled keep-alive session shared by every test
+        connector = aiohttp.TCPConnector(limit=16, keepalive_timeout=30)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await asyncio.gather(*[
+                run_test(session, test_name, test_func) for test_name, test_func in tests
+            ])
+    
+    # The tests are independent I/O against the backend, so run them all at once
+    # and print each one's output as a block
+    stdout = TaskBufferedStdout(sys.stdout)
+    sys.stdout = stdout
+    try:
+        results = asyncio.run(run_all())
+    finally:
+        sys.stdout = stdout.stream
+    
+    for ok, output in results:
+        if ok:
+            passed += 1
+        print(output)
     
     print("=" * 60)
     print(f"🎯 Test Results: {passed}/{total} tests passed")
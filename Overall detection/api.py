@@ -3,20 +3,34 @@ Real-time Coastal Monitoring API using Clay v1.5
 FastAPI backend for the coastal threat detection system
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 import asyncio
+from collections import deque
 from datetime import datetime
+from itertools import islice
+import hashlib
 import json
 
 from main import ClayCoastalMonitor
 
+# orjson serializes the dict/list-heavy responses several times faster than the stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+FastJSONResponse = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+
 app = FastAPI(
     title="Clay v1.5 Coastal Monitoring API",
     description="Real-time coastal threat detection using geospatial foundation models",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Enable CORS for web dashboard
@@ -28,6 +42,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# GET endpoints whose responses rarely change, with how long (seconds) clients may cache them
+CACHEABLE_PATHS = {
+    "/threat-categories": 3600,
+    "/model-info": 3600,
+    "/locations": 30  # Refreshed whenever a location is monitored
+}
+
+@app.middleware("http")
+async def add_cache_headers(request: Request, call_next):
+    """Let browsers and CDNs cache near-static responses and revalidate them by ETag"""
+    response = await call_next(request)
+    max_age = CACHEABLE_PATHS.get(request.url.path)
+    if request.method != "GET" or max_age is None or response.status_code != 200:
+        return response
+    
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    cache_headers = {"Cache-Control": f"public, max-age={max_age}", "ETag": etag}
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=cache_headers)
+    
+    return Response(
+        content=body,
+        status_code=response.status_code,
+        headers={**response.headers, **cache_headers},
+        media_type=response.media_type
+    )
+
 # Global monitor instance
 monitor = ClayCoastalMonitor()
 
@@ -59,9 +102,29 @@ class LocationStatus(BaseModel):
     threat_count: int
 
 # In-memory storage for demo (use database in production)
-monitoring_history = []
+# Only the most recent records are kept so a long-running server doesn't grow without bound
+monitoring_history = deque(maxlen=1000)
+# Alert-only index over the same records, filled at write time so /threats needn't scan
+active_alerts = deque(maxlen=200)
 active_locations = {}
 
+# Locations served by the /demo/* endpoints
+DEMO_LOCATIONS = {
+    "mumbai": "Mumbai Coastal Area, India",
+    "miami": "Miami Beach, Florida, USA",
+    "barrier-reef": "Great Barrier Reef, Australia"
+}
+
+def record_monitoring(record: Dict):
+    """Store a monitoring record in the history and, if it raised an alert, in the alert index"""
+    monitoring_history.append(record)
+    if record["status"] == "alert":
+        active_alerts.append({
+            "location": record["location"],
+            "timestamp": record["timestamp"],
+            "threats": record["threats"]
+        })
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize the Clay model on startup"""
@@ -120,7 +183,7 @@ async def monitor_location(request: MonitoringRequest):
         )
         
         # Store in history
-        monitoring_history.append(response.dict())
+        record_monitoring(response.model_dump())
         active_locations[request.location] = {
             "last_check": response.timestamp,
             "status": response.status,
@@ -135,78 +198,95 @@ async def monitor_location(request: MonitoringRequest):
 @app.get("/locations", response_model=List[LocationStatus])
 async def get_monitored_locations():
     """Get status of all monitored locations"""
-    locations = []
-    for location, data in active_locations.items():
-        locations.append(LocationStatus(
-            location=location,
-            last_check=data["last_check"],
-            status=data["status"],
-            threat_count=data["threat_count"]
-        ))
-    return locations
+    # Stored entries already match LocationStatus, so skip re-validating them on the way out
+    return FastJSONResponse([
+        {"location": location, **data}
+        for location, data in active_locations.items()
+    ])
 
 @app.get("/history")
-async def get_monitoring_history(limit: int = 50):
+async def get_monitoring_history(limit: int = Query(50, ge=1)):
     """Get recent monitoring history"""
-    return monitoring_history[-limit:]
+    records = list(islice(monitoring_history, max(0, len(monitoring_history) - limit), None))
+    # Records hold numpy scalars from the model (probabilities, confidences)
+    if ORJSON_AVAILABLE:
+        dumps = lambda record: orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        dumps = lambda record: json.dumps(record, default=float).encode()
+    
+    def stream_records():
+        # Emit the JSON array one record at a time instead of building a single blob
+        yield b"["
+        for i, record in enumerate(records):
+            if i:
+                yield b","
+            yield dumps(record)
+        yield b"]"
+    
+    return StreamingResponse(stream_records(), media_type="application/json")
 
 @app.get("/threats")
 async def get_active_threats():
     """Get all currently active threats"""
-    active_threats = []
-    for record in monitoring_history[-20:]:  # Check last 20 records
-        if record["status"] == "alert":
-            active_threats.append({
-                "location": record["location"],
-                "timestamp": record["timestamp"],
-                "threats": record["threats"]
-            })
-    return active_threats
+    return FastJSONResponse(list(islice(active_alerts, max(0, len(active_alerts) - 20), None)))
 
 @app.post("/batch-monitor")
 async def batch_monitor_locations(locations: List[str], background_tasks: BackgroundTasks):
     """Monitor multiple locations in batch"""
     
+    def monitor_one(location):
+        result = monitor.monitor_location(location, generate_report=True, visualize=False)
+        
+        # Convert to API format
+        threats = []
+        for threat_type, threat_data in result['threats'].items():
+            threats.append({
+                "threat_type": threat_type,
+                "probability": threat_data['probability'],
+                "severity": threat_data['severity'],
+                "description": monitor.threat_categories[threat_type]
+            })
+        
+        report = result['report']
+        return {
+            "alert_id": report['alert_id'],
+            "timestamp": report['timestamp'],
+            "location": report['location'],
+            "confidence": report['analysis_confidence'],
+            "threats": threats,
+            "recommendations": report['recommendations'],
+            "status": "alert" if threats else "clear"
+        }
+    
     async def process_locations():
+        # Monitor locations concurrently, at most 8 at a time to stay under GEE rate limits
+        semaphore = asyncio.Semaphore(8)
+        
+        async def monitor_limited(location):
+            async with semaphore:
+                return await asyncio.to_thread(monitor_one, location)
+        
+        outcomes = await asyncio.gather(
+            *[monitor_limited(location) for location in locations],
+            return_exceptions=True
+        )
+        
         results = []
-        for location in locations:
-            try:
-                result = monitor.monitor_location(location, generate_report=True, visualize=False)
-                
-                # Convert to API format
-                threats = []
-                for threat_type, threat_data in result['threats'].items():
-                    threats.append({
-                        "threat_type": threat_type,
-                        "probability": threat_data['probability'],
-                        "severity": threat_data['severity'],
-                        "description": monitor.threat_categories[threat_type]
-                    })
-                
-                report = result['report']
-                response_data = {
-                    "alert_id": report['alert_id'],
-                    "timestamp": report['timestamp'],
-                    "location": report['location'],
-                    "confidence": report['analysis_confidence'],
-                    "threats": threats,
-                    "recommendations": report['recommendations'],
-                    "status": "alert" if threats else "clear"
-                }
-                
-                results.append(response_data)
-                monitoring_history.append(response_data)
-                
-                # Update active locations
-                active_locations[location] = {
-                    "last_check": response_data["timestamp"],
-                    "status": response_data["status"],
-                    "threat_count": len(threats)
-                }
-                
-            except Exception as e:
-                print(f"Error monitoring {location}: {e}")
-                
+        for location, outcome in zip(locations, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Error monitoring {location}: {outcome}")
+                continue
+            
+            results.append(outcome)
+            record_monitoring(outcome)
+            
+            # Update active locations
+            active_locations[location] = {
+                "last_check": outcome["timestamp"],
+                "status": outcome["status"],
+                "threat_count": len(outcome["threats"])
+            }
+        
         return results
     
     # Start background processing
@@ -251,19 +331,19 @@ async def get_threat_categories():
 @app.post("/demo/mumbai")
 async def demo_mumbai():
     """Demo endpoint for Mumbai coastal monitoring"""
-    request = MonitoringRequest(location="Mumbai Coastal Area, India")
+    request = MonitoringRequest(location=DEMO_LOCATIONS["mumbai"])
     return await monitor_location(request)
 
 @app.post("/demo/miami")
 async def demo_miami():
     """Demo endpoint for Miami Beach monitoring"""
-    request = MonitoringRequest(location="Miami Beach, Florida, USA")
+    request = MonitoringRequest(location=DEMO_LOCATIONS["miami"])
     return await monitor_location(request)
 
 @app.post("/demo/barrier-reef")
 async def demo_barrier_reef():
     """Demo endpoint for Great Barrier Reef monitoring"""
-    request = MonitoringRequest(location="Great Barrier Reef, Australia")
+    request = MonitoringRequest(location=DEMO_LOCATIONS["barrier-reef"])
     return await monitor_location(request)
 
 if __name__ == "__main__":
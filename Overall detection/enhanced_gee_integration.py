@@ -5,20 +5,335 @@ Real-time satellite data with proper error handling
 
 import ee
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import date, datetime
 import json
 from typing import Dict, List, Optional, Tuple
 import folium
 from PIL import Image
 import io
 import base64
+import os
+from functools import lru_cache
+
+# Redis is optional; without it every request goes to Earth Engine
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Numba is optional; without it threat scoring runs as plain numpy
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Shared generator for the simulated fallback data
+_RNG = np.random.default_rng()
+
+GEE_CACHE_REDIS_URL = os.environ.get("GEE_CACHE_REDIS_URL", "redis://localhost:6379/1")
+S2_CACHE_TTL = 6 * 60 * 60  # Sentinel-2 revisits every 5 days, so a 6h old analysis is still current
+
+# Band means used when reduceRegion fails at every scale
+DEFAULT_BAND_STATS = {
+    'B4': 1200,  # Default red band value
+    'B3': 1100,  # Default green band value
+    'B2': 1000,  # Default blue band value
+    'B8': 2500,  # Default NIR band value
+    'nd': 0.5    # Default NDVI value
+}
+
+# Predefined monitoring areas keyed by normalized (lowercase, stripped) name.
+# Only plain bounds are stored here; ee geometries need ee.Initialize() first.
+_LOCATIONS = {
+    "mumbai coastal area, india": {
+        "bounds": [72.7, 18.85, 72.95, 19.05],
+        "center": [72.825, 18.95],
+        "name": "Mumbai Coast"
+    },
+    "mumbai": {
+        "bounds": [72.7, 18.85, 72.95, 19.05],
+        "center": [72.825, 18.95],
+        "name": "Mumbai Coast"
+    },
+    "kerala": {
+        "bounds": [76.0, 9.5, 76.8, 11.0],  # Smaller focused coastal region
+        "center": [76.4, 10.25],
+        "name": "Kerala Coast"
+    },
+    "kerala coast, india": {
+        "bounds": [76.0, 9.5, 76.8, 11.0],  # Smaller focused coastal region
+        "center": [76.4, 10.25],
+        "name": "Kerala Coast"
+    },
+    "miami beach, florida, usa": {
+        "bounds": [-80.25, 25.65, -80.05, 25.85],
+        "center": [-80.15, 25.75],
+        "name": "Miami Beach"
+    },
+    "miami": {
+        "bounds": [-80.25, 25.65, -80.05, 25.85],
+        "center": [-80.15, 25.75],
+        "name": "Miami Beach"
+    },
+    "chennai coast, india": {
+        "bounds": [80.15, 12.95, 80.35, 13.15],
+        "center": [80.25, 13.05],
+        "name": "Chennai Coast"
+    },
+    "chennai": {
+        "bounds": [80.15, 12.95, 80.35, 13.15],
+        "center": [80.25, 13.05],
+        "name": "Chennai Coast"
+    },
+    "great barrier reef, australia": {
+        "bounds": [145.0, -16.8, 146.5, -15.5],
+        "center": [145.75, -16.15],
+        "name": "Great Barrier Reef"
+    },
+    "maldives coral atolls": {
+        "bounds": [72.8, 3.0, 74.2, 4.5],
+        "center": [73.5, 3.75],
+        "name": "Maldives"
+    },
+    "maldives": {
+        "bounds": [72.8, 3.0, 74.2, 4.5],
+        "center": [73.5, 3.75],
+        "name": "Maldives"
+    },
+    "california coast, usa": {
+        "bounds": [-122.8, 36.2, -121.8, 37.2],
+        "center": [-122.3, 36.7],
+        "name": "California Coast"
+    },
+    "goa coast, india": {
+        "bounds": [73.7, 15.0, 74.3, 15.8],
+        "center": [74.0, 15.4],
+        "name": "Goa Coast"
+    },
+    "sydney harbour, australia": {
+        "bounds": [151.0, -34.0, 151.5, -33.6],
+        "center": [151.25, -33.8],
+        "name": "Sydney Harbour"
+    },
+    "uttarakhand": {
+        "bounds": [78.0, 29.0, 81.0, 31.5],
+        "center": [79.5, 30.25],
+        "name": "Uttarakhand Region"
+    },
+    "uttarakhand, india": {
+        "bounds": [78.0, 29.0, 81.0, 31.5],
+        "center": [79.5, 30.25],
+        "name": "Uttarakhand Region"
+    },
+    "bihar": {
+        "bounds": [83.5, 24.0, 88.5, 27.5],
+        "center": [86.0, 25.75],
+        "name": "Bihar Region"
+    },
+    "bihar, india": {
+        "bounds": [83.5, 24.0, 88.5, 27.5],
+        "center": [86.0, 25.75],
+        "name": "Bihar Region"
+    },
+    "punjab": {
+        "bounds": [73.5, 29.5, 76.8, 32.8],
+        "center": [75.15, 31.15],
+        "name": "Punjab Region"
+    },
+    "punjab, india": {
+        "bounds": [73.5, 29.5, 76.8, 32.8],
+        "center": [75.15, 31.15],
+        "name": "Punjab Region"
+    }
+}
+
+
+@lru_cache(maxsize=256)
+def _resolve_location(location_key: str) -> Optional[Dict]:
+    """Build the location entry, with its ee geometry, once per normalized key"""
+    info = _LOCATIONS.get(location_key)
+    if info is None:
+        return None
+    west, south, east, north = info["bounds"]
+    # Planar approximation of the rectangle's area, good enough to pick a reduction scale
+    width_m = (east - west) * 111320 * np.cos(np.radians((south + north) / 2))
+    height_m = (north - south) * 110574
+    return {
+        "geometry": ee.Geometry.Rectangle(info["bounds"]),
+        "center": info["center"],
+        "name": info["name"],
+        "area_m2": float(width_m * height_m)
+    }
+
+
+@lru_cache(maxsize=8)
+def _day_string(ordinal: int) -> str:
+    """Format a date ordinal as 'YYYY-MM-DD' once, since the search window only moves daily"""
+    return date.fromordinal(ordinal).strftime('%Y-%m-%d')
+
+
+# Simulated threats for the fallback data, per region keyword. Keywords are checked in
+# order and the first one found in the location wins; each threat fires when its
+# uniform draw exceeds the threshold paired with it.
+_CITY_THREATS = {
+    "mumbai": (
+        (0.7, {  # 30% chance of threats
+            "type": "erosion_risk",
+            "severity": "medium",
+            "confidence": 0.78,
+            "description": "Coastal erosion detected along Mumbai shoreline",
+            "recommendation": "Deploy sea wall reinforcements"
+        }),
+        (0.8, {  # 20% chance
+            "type": "water_quality",
+            "severity": "high",
+            "confidence": 0.82,
+            "description": "Elevated pollution levels near industrial zones",
+            "recommendation": "Monitor industrial discharge points"
+        })
+    ),
+    "miami": (
+        (0.6, {  # 40% chance
+            "type": "sea_level_rise",
+            "severity": "medium",
+            "confidence": 0.85,
+            "description": "Gradual sea level rise detected",
+            "recommendation": "Upgrade coastal infrastructure"
+        }),
+    ),
+    "uttarakhand": (  # Uttarakhand (mountain region)
+        (0.5, {  # 50% chance
+            "type": "landslide_risk",
+            "severity": "high",
+            "confidence": 0.80,
+            "description": "Himalayan slope instability detected",
+            "recommendation": "Monitor hill slopes and implement early warning systems"
+        }),
+        (0.7, {  # 30% chance
+            "type": "flash_flood_risk",
+            "severity": "medium",
+            "confidence": 0.75,
+            "description": "River valley flood risk identified",
+            "recommendation": "Install flood monitoring systems in river valleys"
+        })
+    ),
+    "bihar": (  # Bihar (flood-prone plains)
+        (0.4, {  # 60% chance
+            "type": "river_flooding",
+            "severity": "high",
+            "confidence": 0.88,
+            "description": "Ganga river system flood risk detected",
+            "recommendation": "Strengthen embankments and flood control measures"
+        }),
+        (0.6, {  # 40% chance
+            "type": "waterlogging",
+            "severity": "medium",
+            "confidence": 0.72,
+            "description": "Poor drainage system identified",
+            "recommendation": "Improve drainage infrastructure"
+        })
+    ),
+    "punjab": (  # Punjab (agricultural region)
+        (0.5, {  # 50% chance
+            "type": "groundwater_depletion",
+            "severity": "high",
+            "confidence": 0.85,
+            "description": "Rapid groundwater level decline detected",
+            "recommendation": "Implement water conservation measures"
+        }),
+        (0.7, {  # 30% chance
+            "type": "agricultural_stress",
+            "severity": "medium",
+            "confidence": 0.78,
+            "description": "Crop stress patterns identified",
+            "recommendation": "Monitor crop health and irrigation systems"
+        })
+    )
+}
+
+# Report recommendations when neither satellite nor Clay analysis found a threat
+NO_THREAT_RECOMMENDATIONS = (
+    "No immediate threats detected",
+    "Continue routine monitoring",
+    "System operating normally"
+)
+
+# Columns of a region statistics row, as returned by the stacked band + NDVI reduction
+STAT_COLUMNS = ['B4', 'B3', 'B2', 'B8', 'nd']
+
+# Threat thresholds, in one place so every rule reads from the same table
+THREAT_THRESHOLDS = {
+    "ndvi_low": 0.3,           # Vegetation loss below this NDVI
+    "ndvi_very_low": 0.2,      # ...and high severity below this
+    "red_turbid": 2000,        # High red reflectance may indicate turbidity
+    "nir_red_ratio_low": 0.5,  # Erosion/soil degradation below this NIR/red ratio
+    "red_stressed": 1500,      # Agricultural stress: high red...
+    "nir_stressed": 2000       # ...with low NIR
+}
+
+
+def threat_masks(stats: np.ndarray) -> Dict[str, np.ndarray]:
+    """Evaluate every threat rule over an (n, 5) array of STAT_COLUMNS rows in one vectorized pass"""
+    red, nir, ndvi = stats[:, 0], stats[:, 3], stats[:, 4]
+    t = THREAT_THRESHOLDS
+    # Ratio is only meaningful with positive red reflectance; elsewhere it can't trigger
+    nir_red_ratio = np.divide(nir, red, out=np.full_like(red, np.inf), where=red > 0)
+    return {
+        "vegetation_loss": ndvi < t["ndvi_low"],
+        "vegetation_loss_high": ndvi < t["ndvi_very_low"],
+        "water_quality": red > t["red_turbid"],
+        "soil_degradation": nir_red_ratio < t["nir_red_ratio_low"],
+        "agricultural_stress": (red > t["red_stressed"]) & (nir < t["nir_stressed"])
+    }
+
+
+# Clay threat maps larger than this are scored and cut down to their top entries
+# before any dicts are built; smaller maps are reported in full as before
+CLAY_THREAT_LIMIT = 64
+
+SEVERITY_LEVELS = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+SEVERITY_WEIGHTS = np.array([0.25, 0.5, 0.75, 1.0], dtype=np.float32)
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def score_threats(confidence, severity):
+        """Confidence weighted by severity, one score per threat"""
+        scores = np.empty_like(confidence)
+        for i in prange(confidence.shape[0]):
+            scores[i] = confidence[i] * SEVERITY_WEIGHTS[severity[i]]
+        return scores
+else:
+    def score_threats(confidence, severity):
+        """Confidence weighted by severity, one score per threat"""
+        return confidence * SEVERITY_WEIGHTS[severity]
+
+def top_clay_threats(threats: Dict, limit: int = CLAY_THREAT_LIMIT) -> List[Tuple[str, Dict]]:
+    """Return the (type, details) pairs of the `limit` highest scoring Clay threats"""
+    items = list(threats.items())
+    if len(items) <= limit:
+        return items
+    
+    # ClayCoastalMonitor reports "probability"; other sources use "confidence"
+    confidence = np.fromiter((details.get("probability", details.get("confidence", 0.80)) for _, details in items),
+                             dtype=np.float32, count=len(items))
+    severity = np.fromiter((SEVERITY_LEVELS.get(details.get("severity", "medium"), 1) for _, details in items),
+                           dtype=np.int8, count=len(items))
+    # argpartition picks the survivors without sorting the whole set
+    top = np.argpartition(-score_threats(confidence, severity), limit)[:limit]
+    return [items[i] for i in np.sort(top)]
+
 
 class EnhancedGEEManager:
     """Enhanced Google Earth Engine Manager with robust error handling"""
     
     def __init__(self):
         self.is_authenticated = False
+        self.cache = None
+        self._scale_cache = {}  # area bucket (100 km²) -> finest scale that fit after finer ones were too large
         self.initialize_gee()
+        self.initialize_cache()
     
     def initialize_gee(self):
         """Initialize Google Earth Engine with authentication"""
@@ -40,119 +355,40 @@ class EnhancedGEEManager:
             print("💡 Will use fallback data - install 'earthengine authenticate' for real data")
             self.is_authenticated = False
     
+    def initialize_cache(self):
+        """Connect to Redis for caching satellite analyses, if it's available"""
+        if not REDIS_AVAILABLE:
+            return
+        try:
+            client = redis.Redis.from_url(GEE_CACHE_REDIS_URL)
+            client.ping()
+            self.cache = client
+            print("✅ Redis cache connected for satellite data")
+        except Exception as e:
+            print(f"⚠️  Redis cache unavailable, fetching satellite data uncached: {e}")
+    
     def get_location_coordinates(self, location: str) -> Optional[Dict]:
         """Get coordinates for predefined locations"""
-        locations = {
-            "mumbai coastal area, india": {
-                "geometry": ee.Geometry.Rectangle([72.7, 18.85, 72.95, 19.05]),
-                "center": [72.825, 18.95],
-                "name": "Mumbai Coast"
-            },
-            "mumbai": {
-                "geometry": ee.Geometry.Rectangle([72.7, 18.85, 72.95, 19.05]),
-                "center": [72.825, 18.95],
-                "name": "Mumbai Coast"
-            },
-            "kerala": {
-                "geometry": ee.Geometry.Rectangle([76.0, 9.5, 76.8, 11.0]),  # Smaller focused coastal region
-                "center": [76.4, 10.25],
-                "name": "Kerala Coast"
-            },
-            "kerala coast, india": {
-                "geometry": ee.Geometry.Rectangle([76.0, 9.5, 76.8, 11.0]),  # Smaller focused coastal region
-                "center": [76.4, 10.25],
-                "name": "Kerala Coast"
-            },
-            "miami beach, florida, usa": {
-                "geometry": ee.Geometry.Rectangle([-80.25, 25.65, -80.05, 25.85]),
-                "center": [-80.15, 25.75],
-                "name": "Miami Beach"
-            },
-            "miami": {
-                "geometry": ee.Geometry.Rectangle([-80.25, 25.65, -80.05, 25.85]),
-                "center": [-80.15, 25.75],
-                "name": "Miami Beach"
-            },
-            "chennai coast, india": {
-                "geometry": ee.Geometry.Rectangle([80.15, 12.95, 80.35, 13.15]),
-                "center": [80.25, 13.05],
-                "name": "Chennai Coast"
-            },
-            "chennai": {
-                "geometry": ee.Geometry.Rectangle([80.15, 12.95, 80.35, 13.15]),
-                "center": [80.25, 13.05],
-                "name": "Chennai Coast"
-            },
-            "great barrier reef, australia": {
-                "geometry": ee.Geometry.Rectangle([145.0, -16.8, 146.5, -15.5]),
-                "center": [145.75, -16.15],
-                "name": "Great Barrier Reef"
-            },
-            "maldives coral atolls": {
-                "geometry": ee.Geometry.Rectangle([72.8, 3.0, 74.2, 4.5]),
-                "center": [73.5, 3.75],
-                "name": "Maldives"
-            },
-            "maldives": {
-                "geometry": ee.Geometry.Rectangle([72.8, 3.0, 74.2, 4.5]),
-                "center": [73.5, 3.75],
-                "name": "Maldives"
-            },
-            "california coast, usa": {
-                "geometry": ee.Geometry.Rectangle([-122.8, 36.2, -121.8, 37.2]),
-                "center": [-122.3, 36.7],
-                "name": "California Coast"
-            },
-            "goa coast, india": {
-                "geometry": ee.Geometry.Rectangle([73.7, 15.0, 74.3, 15.8]),
-                "center": [74.0, 15.4],
-                "name": "Goa Coast"
-            },
-            "sydney harbour, australia": {
-                "geometry": ee.Geometry.Rectangle([151.0, -34.0, 151.5, -33.6]),
-                "center": [151.25, -33.8],
-                "name": "Sydney Harbour"
-            },
-            "uttarakhand": {
-                "geometry": ee.Geometry.Rectangle([78.0, 29.0, 81.0, 31.5]),
-                "center": [79.5, 30.25],
-                "name": "Uttarakhand Region"
-            },
-            "uttarakhand, india": {
-                "geometry": ee.Geometry.Rectangle([78.0, 29.0, 81.0, 31.5]),
-                "center": [79.5, 30.25],
-                "name": "Uttarakhand Region"
-            },
-            "bihar": {
-                "geometry": ee.Geometry.Rectangle([83.5, 24.0, 88.5, 27.5]),
-                "center": [86.0, 25.75],
-                "name": "Bihar Region"
-            },
-            "bihar, india": {
-                "geometry": ee.Geometry.Rectangle([83.5, 24.0, 88.5, 27.5]),
-                "center": [86.0, 25.75],
-                "name": "Bihar Region"
-            },
-            "punjab": {
-                "geometry": ee.Geometry.Rectangle([73.5, 29.5, 76.8, 32.8]),
-                "center": [75.15, 31.15],
-                "name": "Punjab Region"
-            },
-            "punjab, india": {
-                "geometry": ee.Geometry.Rectangle([73.5, 29.5, 76.8, 32.8]),
-                "center": [75.15, 31.15],
-                "name": "Punjab Region"
-            }
-        }
-        
-        location_key = location.lower().strip()
-        return locations.get(location_key)
+        return _resolve_location(location.lower().strip())
     
     def get_real_satellite_data(self, location: str) -> Dict:
         """Get real satellite data from Google Earth Engine"""
         if not self.is_authenticated:
             return self._get_fallback_data(location)
         
+        # One analysis per location per day; a hit skips every Earth Engine round-trip.
+        # The key and the search window below come from the same local date.
+        today = date.today().toordinal()
+        end_day = _day_string(today)
+        cache_key = f"s2:{location.lower().strip()}:{end_day}"
+        if self.cache is not None:
+            try:
+                cached = self.cache.get(cache_key)
+                if cached:
+                    return json.loads(cached)
+            except Exception as e:
+                print(f"⚠️  Redis cache read failed: {e}")
+        
         try:
             location_info = self.get_location_coordinates(location)
             if not location_info:
@@ -162,70 +398,66 @@ class EnhancedGEEManager:
             geometry = location_info["geometry"]
             
             # Get latest Sentinel-2 data (last 30 days)
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=30)
+            recent_collection = (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
+                               .filterDate(_day_string(today - 30), end_day)
+                               .filterBounds(geometry)
+                               .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 50))  # Relaxed cloud filter
+                               .sort('system:time_start', False))
             
-            s2_collection = (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
-                           .filterDate(start_date.strftime('%Y-%m-%d'), 
-                                     end_date.strftime('%Y-%m-%d'))
-                           .filterBounds(geometry)
-                           .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 50))  # Relaxed cloud filter
-                           .sort('system:time_start', False))
+            # Wider search with more relaxed criteria, used when nothing recent exists
+            wider_collection = (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
+                              .filterDate(_day_string(today - 90), end_day)
+                              .filterBounds(geometry)
+                              .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 80))
+                              .sort('system:time_start', False))
             
-            # Get the size of the collection to check if we have any images
-            collection_size = s2_collection.size().getInfo()
+            # Earth Engine picks between the two server-side, so choosing the collection
+            # and reading the latest image's properties costs a single round-trip
+            recent_size = recent_collection.size()
+            s2_collection = ee.ImageCollection(
+                ee.Algorithms.If(recent_size.gt(0), recent_collection, wider_collection)
+            )
+            summary = self._summarize_collection(s2_collection, recent_size=recent_size)
             
-            if collection_size == 0:
-                print("⚠️  No recent imagery found, trying wider search...")
-                # Try with more relaxed criteria
-                s2_collection = (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
-                               .filterDate((end_date - timedelta(days=90)).strftime('%Y-%m-%d'), 
-                                         end_date.strftime('%Y-%m-%d'))
-                               .filterBounds(geometry)
-                               .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 80))
-                               .sort('system:time_start', False))
-                
-                collection_size = s2_collection.size().getInfo()
-                
-                if collection_size == 0:
-                    print("⚠️  No satellite imagery available for this location")
-                    return self._get_fallback_data(location)
+            if summary['recent_size'] == 0:
+                print("⚠️  No recent imagery found, used wider search...")
             
-            # Get the first (most recent) image
-            selected_image = s2_collection.first()
+            if summary['size'] == 0:
+                print("⚠️  No satellite imagery available for this location")
+                return self._get_fallback_data(location)
             
-            # Check if image exists
-            try:
-                image_props = selected_image.getInfo()
-                if image_props is None:
-                    print("⚠️  No valid image data found")
-                    return self._get_fallback_data(location)
-            except Exception as e:
-                print(f"⚠️  Error getting image properties: {e}")
+            if not summary['time_start']:
+                print("⚠️  No valid image data found")
                 return self._get_fallback_data(location)
+            
             image_date = datetime.fromtimestamp(
-                image_props['properties']['system:time_start'] / 1000
+                summary['time_start'][0] / 1000
             ).strftime('%Y-%m-%d %H:%M:%S')
             
-            cloud_cover = image_props['properties'].get('CLOUDY_PIXEL_PERCENTAGE', 0)
+            cloud_cover = summary['cloud_cover'][0] if summary['cloud_cover'] else 0
+            
+            # Get the first (most recent) image
+            selected_image = s2_collection.first()
             
             # Select bands for analysis (RGB + NIR for vegetation analysis)
             bands = ['B4', 'B3', 'B2', 'B8']  # Red, Green, Blue, NIR
             selected_bands = selected_image.select(bands)
             
-            # Get basic statistics with progressive scaling
-            stats = self._safe_reduce_region(selected_bands, geometry, ee.Reducer.mean())
-            
-            # Calculate NDVI (vegetation index) with same safe approach
+            # Stack NDVI (vegetation index) as an 'nd' band so a single
+            # reduceRegion with progressive scaling returns every mean
             ndvi = selected_bands.normalizedDifference(['B8', 'B4'])
-            ndvi_stats = self._safe_reduce_region(ndvi, geometry, ee.Reducer.mean())
+            stats = self._safe_reduce_region(selected_bands.addBands(ndvi), geometry, ee.Reducer.mean(),
+                                             area_m2=location_info["area_m2"])
+            reduced = stats is not None
+            if not reduced:
+                stats = dict(DEFAULT_BAND_STATS)
             
-            avg_ndvi = ndvi_stats.get('nd', 0.5)
+            avg_ndvi = stats.pop('nd', 0.5)
             
             # Analyze coastal changes
             threats = self._analyze_coastal_threats(stats, avg_ndvi, cloud_cover)
             
-            return {
+            result = {
                 "success": True,
                 "data_source": "Google Earth Engine",
                 "location": location_info["name"],
@@ -235,17 +467,46 @@ class EnhancedGEEManager:
                 "band_stats": stats,
                 "threats": threats,
                 "analysis_timestamp": datetime.now().isoformat(),
-                "real_data": True
+                "real_data": reduced
             }
             
+            # Never cache placeholder stats; the next call should retry Earth Engine
+            if self.cache is not None and reduced:
+                try:
+                    self.cache.setex(cache_key, S2_CACHE_TTL, json.dumps(result))
+                except Exception as e:
+                    print(f"⚠️  Redis cache write failed: {e}")
+            
+            return result
+            
         except Exception as e:
             print(f"❌ Error fetching satellite data: {e}")
             return self._get_fallback_data(location)
     
-    def _safe_reduce_region(self, image, geometry, reducer):
-        """Safely reduce region with automatic scale adjustment"""
+    def _summarize_collection(self, collection, **extra) -> Dict:
+        """Fetch the collection size, the first image's date and cloud cover, and any extra
+        server-side values in one request"""
+        first = collection.limit(1)
+        return ee.Dictionary({
+            'size': collection.size(),
+            'time_start': first.aggregate_array('system:time_start'),
+            'cloud_cover': first.aggregate_array('CLOUDY_PIXEL_PERCENTAGE'),
+            **extra
+        }).getInfo()
+    
+    def _safe_reduce_region(self, image, geometry, reducer, area_m2: Optional[float] = None) -> Optional[Dict]:
+        """Safely reduce region with automatic scale adjustment; None if every scale failed"""
         scales = [30, 100, 250, 500, 1000]  # Progressive scales from high to low resolution
         
+        bucket = None
+        if area_m2 is not None:
+            # Resume from the finest scale known to fit a region of this size
+            bucket = int(area_m2 // 1e8)
+            cached_scale = self._scale_cache.get(bucket)
+            if cached_scale in scales:
+                scales = scales[scales.index(cached_scale):]
+        
+        too_many_pixels = False
         for scale in scales:
             try:
                 result = image.reduceRegion(
@@ -257,43 +518,44 @@ class EnhancedGEEManager:
                 ).getInfo()
                 
                 print(f"✅ Successfully processed at {scale}m resolution")
+                # Only remember a coarser scale when the finer ones were rejected for
+                # size in this same call; other errors never reach this point
+                if bucket is not None and too_many_pixels:
+                    self._scale_cache[bucket] = scale
                 return result
                 
             except Exception as e:
                 if "Too many pixels" in str(e):
                     print(f"⚠️  Scale {scale}m too high, trying lower resolution...")
+                    too_many_pixels = True
                     continue
                 else:
                     print(f"❌ Error at scale {scale}m: {e}")
                     break
         
-        # If all scales fail, return default values
+        # If all scales fail, let the caller fall back to DEFAULT_BAND_STATS
         print("⚠️  All scales failed, using default values")
-        return {
-            'B4': 1200,  # Default red band value
-            'B3': 1100,  # Default green band value  
-            'B2': 1000,  # Default blue band value
-            'B8': 2500,  # Default NIR band value
-            'nd': 0.5    # Default NDVI value
-        }
+        return None
     
     def _analyze_coastal_threats(self, band_stats: Dict, ndvi: float, cloud_cover: float) -> List[Dict]:
         """Analyze satellite data for environmental threats (coastal and inland)"""
+        stats = np.array([[band_stats.get(band, 0) for band in STAT_COLUMNS[:-1]] + [ndvi]], dtype=float)
+        masks = threat_masks(stats)
+        
         threats = []
         
         # Vegetation loss detection (applicable to all regions)
-        if ndvi < 0.3:
+        if masks["vegetation_loss"][0]:
             threats.append({
                 "type": "vegetation_loss",
-                "severity": "high" if ndvi < 0.2 else "medium",
+                "severity": "high" if masks["vegetation_loss_high"][0] else "medium",
                 "confidence": 0.85,
                 "description": f"Low vegetation index detected (NDVI: {ndvi:.3f})",
                 "recommendation": "Monitor vegetation health and implement conservation measures"
             })
         
         # Water quality/turbidity (for coastal and river regions)
-        red_reflectance = band_stats.get('B4', 0)
-        if red_reflectance > 2000:  # High red reflectance may indicate turbidity
+        if masks["water_quality"][0]:
             threats.append({
                 "type": "water_quality",
                 "severity": "medium",
@@ -303,8 +565,7 @@ class EnhancedGEEManager:
             })
         
         # Erosion/soil degradation indicators
-        nir_reflectance = band_stats.get('B8', 0)
-        if red_reflectance > 0 and (nir_reflectance / red_reflectance) < 0.5:
+        if masks["soil_degradation"][0]:
             threats.append({
                 "type": "soil_degradation",
                 "severity": "medium",
@@ -314,7 +575,7 @@ class EnhancedGEEManager:
             })
         
         # Agricultural stress detection (high red, low NIR)
-        if red_reflectance > 1500 and nir_reflectance < 2000:
+        if masks["agricultural_stress"][0]:
             threats.append({
                 "type": "agricultural_stress",
                 "severity": "medium",
@@ -327,118 +588,35 @@ class EnhancedGEEManager:
     
     def _get_fallback_data(self, location: str) -> Dict:
         """Enhanced fallback data that simulates realistic coastal analysis"""
-        import random
+        # Threat chances ([0], [1]), cloud cover ([2]) and NDVI ([3]) from a single draw
+        draws = _RNG.random(4)
         
         # Simulate realistic threats based on location
         location_lower = location.lower()
         threats = []
-        
-        # Mumbai-specific threats
-        if "mumbai" in location_lower:
-            if random.random() > 0.7:  # 30% chance of threats
-                threats.append({
-                    "type": "erosion_risk",
-                    "severity": "medium",
-                    "confidence": 0.78,
-                    "description": "Coastal erosion detected along Mumbai shoreline",
-                    "recommendation": "Deploy sea wall reinforcements"
-                })
-            if random.random() > 0.8:  # 20% chance
-                threats.append({
-                    "type": "water_quality",
-                    "severity": "high",
-                    "confidence": 0.82,
-                    "description": "Elevated pollution levels near industrial zones",
-                    "recommendation": "Monitor industrial discharge points"
-                })
-        
-        # Miami-specific threats
-        elif "miami" in location_lower:
-            if random.random() > 0.6:  # 40% chance
-                threats.append({
-                    "type": "sea_level_rise",
-                    "severity": "medium",
-                    "confidence": 0.85,
-                    "description": "Gradual sea level rise detected",
-                    "recommendation": "Upgrade coastal infrastructure"
-                })
-        
-        # Uttarakhand-specific threats (mountain region)
-        elif "uttarakhand" in location_lower:
-            if random.random() > 0.5:  # 50% chance
-                threats.append({
-                    "type": "landslide_risk",
-                    "severity": "high",
-                    "confidence": 0.80,
-                    "description": "Himalayan slope instability detected",
-                    "recommendation": "Monitor hill slopes and implement early warning systems"
-                })
-            if random.random() > 0.7:  # 30% chance
-                threats.append({
-                    "type": "flash_flood_risk",
-                    "severity": "medium",
-                    "confidence": 0.75,
-                    "description": "River valley flood risk identified",
-                    "recommendation": "Install flood monitoring systems in river valleys"
-                })
-        
-        # Bihar-specific threats (flood-prone plains)
-        elif "bihar" in location_lower:
-            if random.random() > 0.4:  # 60% chance
-                threats.append({
-                    "type": "river_flooding",
-                    "severity": "high",
-                    "confidence": 0.88,
-                    "description": "Ganga river system flood risk detected",
-                    "recommendation": "Strengthen embankments and flood control measures"
-                })
-            if random.random() > 0.6:  # 40% chance
-                threats.append({
-                    "type": "waterlogging",
-                    "severity": "medium",
-                    "confidence": 0.72,
-                    "description": "Poor drainage system identified",
-                    "recommendation": "Improve drainage infrastructure"
-                })
-        
-        # Punjab-specific threats (agricultural region)
-        elif "punjab" in location_lower:
-            if random.random() > 0.5:  # 50% chance
-                threats.append({
-                    "type": "groundwater_depletion",
-                    "severity": "high",
-                    "confidence": 0.85,
-                    "description": "Rapid groundwater level decline detected",
-                    "recommendation": "Implement water conservation measures"
-                })
-            if random.random() > 0.7:  # 30% chance
-                threats.append({
-                    "type": "agricultural_stress",
-                    "severity": "medium",
-                    "confidence": 0.78,
-                    "description": "Crop stress patterns identified",
-                    "recommendation": "Monitor crop health and irrigation systems"
-                })
+        for keyword, city_threats in _CITY_THREATS.items():
+            if keyword in location_lower:
+                for draw, (threshold, threat) in zip(draws, city_threats):
+                    if draw > threshold:
+                        threats.append(dict(threat))
+                break
         
         # Generate realistic satellite parameters
-        cloud_cover = random.uniform(5, 25)
-        ndvi = random.uniform(0.4, 0.8)
+        cloud_cover = 5 + draws[2] * 20
+        ndvi = 0.4 + draws[3] * 0.4
+        b4, b3, b2, b8 = _RNG.integers([1000, 900, 800, 2000], [1500, 1400, 1300, 3000], endpoint=True).tolist()
+        now = datetime.now()  # The simulated image is "taken" at analysis time
         
         return {
             "success": True,
             "data_source": "Enhanced Simulation (Clay v1.5 Processing)",
             "location": location,
-            "image_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            "cloud_cover": round(cloud_cover, 1),
-            "ndvi": round(ndvi, 3),
-            "band_stats": {
-                "B4": random.randint(1000, 1500), 
-                "B3": random.randint(900, 1400), 
-                "B2": random.randint(800, 1300), 
-                "B8": random.randint(2000, 3000)
-            },
+            "image_date": now.strftime('%Y-%m-%d %H:%M:%S'),
+            "cloud_cover": round(float(cloud_cover), 1),
+            "ndvi": round(float(ndvi), 3),
+            "band_stats": {"B4": b4, "B3": b3, "B2": b2, "B8": b8},
             "threats": threats,
-            "analysis_timestamp": datetime.now().isoformat(),
+            "analysis_timestamp": now.isoformat(),
             "real_data": False,
             "note": "Enhanced simulation with realistic coastal threat analysis"
         }
@@ -446,33 +624,41 @@ class EnhancedGEEManager:
     def create_analysis_report(self, satellite_data: Dict, clay_analysis: Dict) -> Dict:
         """Create comprehensive analysis report combining GEE and Clay v1.5"""
         
-        # Combine threats from satellite analysis and Clay model
-        all_threats = satellite_data.get("threats", [])
-        clay_threats = clay_analysis.get("threats", {})
-        
         # Convert Clay threats to standardized format
-        for threat_type, details in clay_threats.items():
-            all_threats.append({
+        clay_threats = [
+            {
                 "type": threat_type,
                 "severity": details.get("severity", "medium"),
                 "confidence": details.get("confidence", 0.80),
                 "description": details.get("description", f"Clay v1.5 detected {threat_type}"),
                 "recommendation": details.get("recommendation", "Continue monitoring")
-            })
+            }
+            for threat_type, details in top_clay_threats(clay_analysis.get("threats", {}))
+        ]
+        
+        # Combine threats from satellite analysis and Clay model into a new list,
+        # leaving the caller's satellite_data["threats"] untouched
+        all_threats = [*satellite_data.get("threats", ()), *clay_threats]
+        
+        # Both sources often report the same threat; keep the most confident
+        # entry per (type, severity), in the order each was first seen
+        best = {}
+        for threat in all_threats:
+            key = (threat["type"], threat["severity"])
+            current = best.get(key)
+            if current is None or threat["confidence"] > current["confidence"]:
+                best[key] = threat
+        all_threats = list(best.values())
         
         # Generate recommendations
-        recommendations = []
         if not all_threats:
-            recommendations = [
-                "No immediate threats detected",
-                "Continue routine monitoring",
-                "System operating normally"
-            ]
+            recommendations = list(NO_THREAT_RECOMMENDATIONS)
         else:
-            recommendations = list(set([threat["recommendation"] for threat in all_threats]))
+            # Unique recommendations in the order their threats were found, at most 5
+            recommendations = list(dict.fromkeys(threat["recommendation"] for threat in all_threats))[:5]
         
         return {
-            "alert_id": f"COAST_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            "alert_id": f"COAST_{datetime.now():%Y%m%d_%H%M%S}",
             "location": satellite_data["location"],
             "timestamp": satellite_data["analysis_timestamp"],
             "data_source": satellite_data["data_source"],
@@ -484,7 +670,7 @@ class EnhancedGEEManager:
             },
             "threats_detected": len(all_threats),
             "threat_details": all_threats,
-            "recommendations": recommendations[:5],  # Limit to 5 recommendations
+            "recommendations": recommendations,
             "analysis_confidence": 0.92,
             "status": "alert" if all_threats else "clear"
         }
@@ -3,12 +3,18 @@ Fixed Production API - Robust handling of Earth Engine issues
 Works with or without authentication, provides graceful fallbacks
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
+import asyncio
 import json
 import os
+import time
+from collections import Counter, deque
+from itertools import islice
 from datetime import datetime
 
 # Import fixed monitor
@@ -18,10 +24,22 @@ try:
 except ImportError:
     MONITOR_AVAILABLE = False
 
+# orjson encodes the response dicts several times faster than the stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def json_bytes(payload) -> bytes:
+    """Encode a payload to JSON bytes, with orjson when it's available"""
+    return orjson.dumps(payload) if ORJSON_AVAILABLE else json.dumps(payload).encode()
+
 app = FastAPI(
     title="Clay v1.5 Fixed Coastal Monitoring API",
     description="Robust coastal monitoring with graceful fallbacks for authentication issues",
-    version="2.1.0"
+    version="2.1.0",
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
 )
 
 # Enable CORS
@@ -68,9 +86,70 @@ class MonitoringResponse(BaseModel):
     status: str
     error_message: Optional[str] = None
 
-# Storage
-monitoring_results = []
-system_logs = []
+def monitoring_response(error_message: Optional[str] = None, **fields) -> Dict:
+    """Build a /monitor/robust response dict with exactly the MonitoringResponse fields"""
+    return {**fields, "error_message": error_message}
+
+# Storage, bounded so a long-running deployment keeps only the most recent entries.
+# This lives in process memory, so the server runs a single worker (see __main__);
+# multiple workers would each see only their own results, logs and statistics.
+monitoring_results = deque(maxlen=10000)
+system_logs = deque(maxlen=5000)
+
+# Running statistics over monitoring_results, updated on insert so /monitor/history needn't rescan
+monitoring_stats = {
+    "total_threats": 0,
+    "real_data": 0,
+    "locations": Counter()
+}
+
+def record_result(result: Dict):
+    """Store a monitoring result and fold it into the running statistics"""
+    if len(monitoring_results) == monitoring_results.maxlen:
+        # The oldest result is about to be evicted; take it back out of the statistics
+        oldest = monitoring_results[0]
+        monitoring_stats["total_threats"] -= oldest['threats_detected']
+        monitoring_stats["real_data"] -= int(oldest['real_data_used'])
+        monitoring_stats["locations"][oldest['location']] -= 1
+        if not monitoring_stats["locations"][oldest['location']]:
+            del monitoring_stats["locations"][oldest['location']]
+    monitoring_stats["total_threats"] += result['threats_detected']
+    monitoring_stats["real_data"] += int(result['real_data_used'])
+    monitoring_stats["locations"][result['location']] += 1
+    monitoring_results.append(result)
+
+# Dashboards poll / and /system/status constantly, but the status only changes when
+# Earth Engine or the Clay model comes or goes, so both are rebuilt at most this often
+STATUS_CACHE_TTL = 2.0  # seconds
+_status_cache = {}  # endpoint -> (built_at, response)
+
+# Feature lists for every (clay_available, ee_available) combination, built once
+ROOT_FEATURES = {
+    (clay, ee): (
+        (("Clay v1.5 foundation model",) if clay else ())
+        + (("Real satellite data (Google Earth Engine)",) if ee else ())
+        + ("Simulated data demonstration", "Robust error handling", "Graceful fallbacks")
+    )
+    for clay in (False, True) for ee in (False, True)
+}
+STATUS_FEATURES = {
+    (clay, ee): (
+        (("Clay v1.5 AI model",) if clay else ())
+        + (("Real satellite data",) if ee else ())
+        + ("Threat detection", "Report generation", "Error handling")
+    )
+    for clay in (False, True) for ee in (False, True)
+}
+
+def cached_status(endpoint: str, build):
+    """Return the endpoint's cached response, rebuilding it once the TTL has passed"""
+    now = time.monotonic()
+    cached = _status_cache.get(endpoint)
+    if cached and now - cached[0] < STATUS_CACHE_TTL:
+        return cached[1]
+    response = build()
+    _status_cache[endpoint] = (now, response)
+    return response
 
 @app.on_event("startup")
 async def startup_event():
@@ -102,17 +181,15 @@ async def startup_event():
 @app.get("/")
 async def root():
     """API health check"""
+    # Cache the encoded body so cached hits skip JSON encoding as well
+    body = cached_status("/", lambda: json_bytes(build_root()))
+    return Response(content=body, media_type="application/json")
+
+def build_root():
+    """Build the health check payload from the monitor's current status"""
     if monitor:
         status = monitor.get_system_status()
-        features = []
-        
-        if status['clay_available']:
-            features.append("Clay v1.5 foundation model")
-        if status['ee_available']:
-            features.append("Real satellite data (Google Earth Engine)")
-        features.append("Simulated data demonstration")
-        features.append("Robust error handling")
-        features.append("Graceful fallbacks")
+        features = ROOT_FEATURES[(bool(status['clay_available']), bool(status['ee_available']))]
         
         return {
             "message": "Clay v1.5 Fixed Coastal Monitoring API",
@@ -135,15 +212,13 @@ async def root():
 @app.get("/system/status", response_model=SystemStatusResponse)
 async def get_system_status():
     """Get detailed system status"""
+    return cached_status("/system/status", build_system_status)
+
+def build_system_status():
+    """Build the detailed status response from the monitor's current status"""
     if monitor:
         status = monitor.get_system_status()
-        
-        features = []
-        if status['clay_available']:
-            features.append("Clay v1.5 AI model")
-        if status['ee_available']:
-            features.append("Real satellite data")
-        features.extend(["Threat detection", "Report generation", "Error handling"])
+        features = STATUS_FEATURES[(bool(status['clay_available']), bool(status['ee_available']))]
         
         return SystemStatusResponse(
             status="operational",
@@ -165,16 +240,20 @@ async def get_system_status():
             features_available=["Basic API functionality"]
         )
 
-@app.post("/monitor/robust", response_model=MonitoringResponse)
+# Responses are plain dicts in the MonitoringResponse shape; declaring the model only in
+# the docs skips a second validation and serialization pass on every request
+@app.post("/monitor/robust", responses={200: {"model": MonitoringResponse}})
 async def monitor_location_robust(request: RobustMonitoringRequest):
     """Robust monitoring endpoint with graceful error handling"""
+    # Each response path reads the clock once and derives its alert id and timestamp from it
     try:
         if not monitor:
+            now = datetime.now()
             # Minimal fallback response
-            return MonitoringResponse(
+            return monitoring_response(
                 success=True,
-                alert_id=f"MINIMAL_{int(datetime.now().timestamp())}",
-                timestamp=datetime.now().isoformat(),
+                alert_id=f"MINIMAL_{int(now.timestamp())}",
+                timestamp=now.isoformat(),
                 location=request.location,
                 mode="minimal",
                 data_source="API fallback",
@@ -189,12 +268,14 @@ async def monitor_location_robust(request: RobustMonitoringRequest):
                 error_message="Full monitoring system not available"
             )
         
-        # Run monitoring
-        result = monitor.monitor_location(
+        # Run monitoring on the threadpool; it blocks on Earth Engine and model inference
+        result = await run_in_threadpool(
+            monitor.monitor_location,
             location=request.location,
             generate_report=request.generate_report,
             visualize=request.create_visualization
         )
+        now = datetime.now()
         
         if result['success']:
             analysis = result['result']
@@ -211,10 +292,10 @@ async def monitor_location_robust(request: RobustMonitoringRequest):
                 recommendations = ["Continue monitoring", "System operational"]
             
             # Create response
-            response = MonitoringResponse(
+            response = monitoring_response(
                 success=True,
-                alert_id=analysis.get('report', {}).get('alert_id', f"ROBUST_{int(datetime.now().timestamp())}"),
-                timestamp=datetime.now().isoformat(),
+                alert_id=analysis.get('report', {}).get('alert_id', f"ROBUST_{int(now.timestamp())}"),
+                timestamp=now.isoformat(),
                 location=request.location,
                 mode=result['mode'],
                 data_source=result['data_source'],
@@ -225,11 +306,11 @@ async def monitor_location_robust(request: RobustMonitoringRequest):
             )
             
             # Store result
-            monitoring_results.append(response.dict())
+            record_result(response)
             
             # Log successful monitoring
             system_logs.append({
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now.isoformat(),
                 "event": "monitoring_success",
                 "location": request.location,
                 "mode": result['mode'],
@@ -240,10 +321,10 @@ async def monitor_location_robust(request: RobustMonitoringRequest):
         
         else:
             # Handle monitoring failure
-            return MonitoringResponse(
+            return monitoring_response(
                 success=False,
-                alert_id=f"ERROR_{int(datetime.now().timestamp())}",
-                timestamp=datetime.now().isoformat(),
+                alert_id=f"ERROR_{int(now.timestamp())}",
+                timestamp=now.isoformat(),
                 location=request.location,
                 mode="error",
                 data_source="none",
@@ -255,11 +336,12 @@ async def monitor_location_robust(request: RobustMonitoringRequest):
             )
             
     except Exception as e:
+        now = datetime.now()
         # Ultimate fallback
-        error_response = MonitoringResponse(
+        error_response = monitoring_response(
             success=False,
-            alert_id=f"EXCEPTION_{int(datetime.now().timestamp())}",
-            timestamp=datetime.now().isoformat(),
+            alert_id=f"EXCEPTION_{int(now.timestamp())}",
+            timestamp=now.isoformat(),
             location=request.location,
             mode="exception",
             data_source="none",
@@ -272,7 +354,7 @@ async def monitor_location_robust(request: RobustMonitoringRequest):
         
         # Log exception
         system_logs.append({
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "event": "api_exception",
             "location": request.location,
             "error": str(e)
@@ -283,21 +365,19 @@ async def monitor_location_robust(request: RobustMonitoringRequest):
 @app.get("/monitor/history")
 async def get_monitoring_history(limit: int = Query(20, description="Number of records")):
     """Get monitoring history"""
-    recent_results = monitoring_results[-limit:] if monitoring_results else []
+    recent_results = list(islice(monitoring_results, max(0, len(monitoring_results) - limit), None))
     
-    # Calculate statistics
-    total_locations = len(set(r['location'] for r in recent_results))
-    total_threats = sum(r['threats_detected'] for r in recent_results)
-    real_data_count = sum(1 for r in recent_results if r['real_data_used'])
+    # Statistics cover every stored result and are maintained by record_result()
+    real_data_count = monitoring_stats["real_data"]
     
     return {
         "history": recent_results,
         "statistics": {
-            "total_requests": len(recent_results),
-            "unique_locations": total_locations,
-            "total_threats_detected": total_threats,
+            "total_requests": len(monitoring_results),
+            "unique_locations": len(monitoring_stats["locations"]),
+            "total_threats_detected": monitoring_stats["total_threats"],
             "real_data_requests": real_data_count,
-            "demo_requests": len(recent_results) - real_data_count
+            "demo_requests": len(monitoring_results) - real_data_count
         },
         "timestamp": datetime.now().isoformat()
     }
@@ -305,7 +385,7 @@ async def get_monitoring_history(limit: int = Query(20, description="Number of r
 @app.get("/system/logs")
 async def get_system_logs(limit: int = Query(10, description="Number of log entries")):
     """Get system logs for debugging"""
-    recent_logs = system_logs[-limit:] if system_logs else []
+    recent_logs = list(islice(system_logs, max(0, len(system_logs) - limit), None))
     
     return {
         "logs": recent_logs,
@@ -322,24 +402,27 @@ async def test_multiple_locations():
         "Chennai Coast, India"
     ]
     
-    results = []
+    # Monitor all test locations concurrently
+    outcomes = await asyncio.gather(*[
+        monitor_location_robust(RobustMonitoringRequest(location=location, create_visualization=False))
+        for location in test_locations
+    ], return_exceptions=True)
     
-    for location in test_locations:
-        try:
-            request = RobustMonitoringRequest(location=location, create_visualization=False)
-            result = await monitor_location_robust(request)
+    results = []
+    for location, result in zip(test_locations, outcomes):
+        if isinstance(result, Exception):
             results.append({
                 "location": location,
-                "success": result.success,
-                "mode": result.mode,
-                "threats": result.threats_detected,
-                "status": result.status
+                "success": False,
+                "error": str(result)
             })
-        except Exception as e:
+        else:
             results.append({
                 "location": location,
-                "success": False,
-                "error": str(e)
+                "success": result["success"],
+                "mode": result["mode"],
+                "threats": result["threats_detected"],
+                "status": result["status"]
             })
     
     return {
@@ -362,15 +445,19 @@ async def demo_miami():
     request = RobustMonitoringRequest(location="Miami Beach, Florida, USA")
     return await monitor_location_robust(request)
 
+# Liveness probes hit /health constantly and only its timestamp changes, so the rest
+# of the body is encoded once and the timestamp is spliced in per request
+_HEALTH_HEAD = b'{"status":"healthy","timestamp":"'
+_HEALTH_TAIL = b'",' + json_bytes({
+    "api_version": "2.1.0",
+    "message": "Clay v1.5 Fixed API is operational"
+})[1:]
+
 @app.get("/health")
 async def health_check():
     """Simple health check that always works"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "api_version": "2.1.0",
-        "message": "Clay v1.5 Fixed API is operational"
-    }
+    body = _HEALTH_HEAD + datetime.now().isoformat().encode() + _HEALTH_TAIL
+    return Response(content=body, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
@@ -380,4 +467,13 @@ if __name__ == "__main__":
     print("🌐 Server will start at: http://localhost:8002")
     print("📖 API docs available at: http://localhost:8002/docs")
     
-    uvicorn.run(app, host="0.0.0.0", port=8002)
+    # Results, logs and statistics are kept in process memory, so extra uvicorn
+    # workers would each serve a different /monitor/history and /status. Stay on
+    # one worker until that state moves to shared storage (e.g. Redis).
+    workers = int(os.environ.get("API_WORKERS", "1"))
+    if workers > 1:
+        print(f"⚠️ API_WORKERS={workers} ignored: monitoring state is per-process, running 1 worker")
+        workers = 1
+    print(f"👷 Workers: {workers}")
+    
+    uvicorn.run("fixed_production_api:app", host="0.0.0.0", port=8002, workers=workers)
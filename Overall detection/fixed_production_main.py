@@ -6,17 +6,42 @@ Handles Windows authentication issues and provides robust fallback
 import os
 import sys
 import json
+import logging
 import warnings
+from functools import lru_cache
 from datetime import datetime
 from pathlib import Path
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger(__name__)
+
+# orjson parses the config faster than the stdlib when it's installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# The original Clay monitor lives in main.py next to this file; make it importable
+# once per process instead of growing sys.path on every monitor construction
+_CWD = os.getcwd()
+if _CWD not in sys.path:
+    sys.path.append(_CWD)
+
+try:
+    from main import ClayCoastalMonitor
+    CLAY_MONITOR_AVAILABLE = True
+except Exception as e:  # main.py imports torch, which can fail with OSError etc.
+    CLAY_MONITOR_AVAILABLE = False
+    CLAY_MONITOR_IMPORT_ERROR = e
+
+@lru_cache(maxsize=1)
 def load_system_config():
-    """Load system configuration"""
-    config_file = "system_config.json"
-    if os.path.exists(config_file):
-        with open(config_file, 'r') as f:
-            return json.load(f)
+    """Load system configuration, once per process (load_system_config.cache_clear() to reload)"""
+    config_file = Path("system_config.json")
+    if config_file.exists():
+        data = config_file.read_bytes()
+        return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
     
     # Default to demo mode if no config
     return {
@@ -31,6 +56,9 @@ class FixedClayMonitor:
     Fixed Clay monitor that handles Earth Engine authentication issues
     """
     
+    # Fixed attribute set: no per-instance __dict__, and slot reads on every monitor call
+    __slots__ = ("config", "mode", "ee_available", "clay_monitor")
+    
     def __init__(self):
         """Initialize with proper error handling"""
         self.config = load_system_config()
@@ -59,15 +87,23 @@ class FixedClayMonitor:
                 'ee-public-data'            # Public project
             ]
             
-            for project in project_options:
+            def try_project(project):
+                # Per-attempt detail is debug logging: lazily formatted, and silent
+                # unless the app turns that level on
                 try:
-                    print(f"🔄 Trying to initialize GEE with project: {project}")
+                    logger.debug("Trying to initialize GEE with project: %s", project)
                     ee.Initialize(project=project)
-                    print(f"✅ Google Earth Engine initialized with project: {project}")
                     return True
                 except Exception as e:
-                    print(f"❌ Failed with project {project}: {e}")
-                    continue
+                    logger.debug("Failed to initialize GEE with project %s: %s", project, e)
+                    return False
+            
+            # ee.Initialize mutates ee's module globals, so probe one project at a
+            # time in preference order and stop at the first that works
+            for project in project_options:
+                if try_project(project):
+                    print(f"✅ Google Earth Engine initialized with project: {project}")
+                    return True
             
             # Fallback: Try without project
             try:
@@ -86,11 +122,12 @@ class FixedClayMonitor:
     
     def _setup_clay_monitor(self):
         """Setup Clay monitor"""
+        if not CLAY_MONITOR_AVAILABLE:
+            print(f"❌ Error setting up Clay monitor: {CLAY_MONITOR_IMPORT_ERROR}")
+            self.clay_monitor = None
+            return
+        
         try:
-            # Import the original Clay monitor
-            sys.path.append(os.getcwd())
-            from main import ClayCoastalMonitor
-            
             self.clay_monitor = ClayCoastalMonitor()
             success = self.clay_monitor.load_clay_model()
             
@@ -97,8 +97,7 @@ def setup_earthengine_credentials():
             ee_config_dir.mkdir(parents=True, exist_ok=True)
             
             credentials_file = ee_config_dir / "credentials"
-            with open(credentials_file, 'w') as f:
-                f.write(token)
+            credentials_file.write_text(token)
             
             print("💾 Token saved to credentials file")
         
@@ -5,7 +5,6 @@ Real-time satellite data acquisition for production-level deployment
 
 import ee
 import numpy as np
-import pandas as pd
 from datetime import datetime, timedelta
 import json
 import requests
@@ -16,6 +15,157 @@ import geemap
 from PIL import Image
 import io
 import base64
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+# The high-volume endpoint is built for many concurrent requests, like the
+# parallel sensor lookups and raster fetches below
+HIGH_VOLUME_URL = 'https://earthengine-highvolume.googleapis.com'
+
+# Clay v1.5 takes square rasters of this size; Sentinel-2 band -> Clay band
+CLAY_TILE_SIZE = 256
+S2_CLAY_BANDS = {
+    'B2': 'blue',
+    'B3': 'green',
+    'B4': 'red',
+    'B8': 'nir',
+    'B11': 'swir1',
+    'B12': 'swir2'
+}
+
+# Written by `earthengine authenticate`; only used to explain why auth is needed
+EE_CREDENTIALS_PATH = Path.home() / '.config' / 'earthengine' / 'credentials'
+
+# Converted Clay inputs, pickled per location and image date so repeat runs
+# on the same imagery skip the raster downloads
+GEE_CACHE_DIR = Path('.gee_cache')
+
+# Image properties fetched for each sensor's latest image
+SENSOR_PROPERTIES = {
+    'Sentinel-2': ['system:time_start', 'CLOUDY_PIXEL_PERCENTAGE'],
+    'Sentinel-1': ['system:time_start']
+}
+
+
+# Predefined coastal locations with precise coordinates, keyed by normalized name.
+# Only plain bounds live here; ee geometries need ee.Initialize() first.
+_LOCATIONS = {
+    "mumbai coastal area, india": {
+        "bounds": [72.7, 18.85, 72.95, 19.05],
+        "center": [72.825, 18.95]
+    },
+    "miami beach, florida, usa": {
+        "bounds": [-80.25, 25.65, -80.05, 25.85],
+        "center": [-80.15, 25.75]
+    },
+    "great barrier reef, australia": {
+        "bounds": [145.0, -16.8, 146.5, -15.5],
+        "center": [145.75, -16.15]
+    },
+    "maldives coral atolls": {
+        "bounds": [72.8, 3.0, 74.2, 4.5],
+        "center": [73.5, 3.75]
+    },
+    "california coast, usa": {
+        "bounds": [-122.8, 36.2, -121.8, 37.2],
+        "center": [-122.3, 36.7]
+    },
+    "chennai coast, india": {
+        "bounds": [80.15, 12.95, 80.35, 13.15],
+        "center": [80.25, 13.05]
+    },
+    "rio de janeiro coast, brazil": {
+        "bounds": [-43.8, -23.2, -43.0, -22.6],
+        "center": [-43.4, -22.9]
+    },
+    "sydney harbour, australia": {
+        "bounds": [151.0, -34.0, 151.5, -33.6],
+        "center": [151.25, -33.8]
+    }
+}
+
+
+@lru_cache(maxsize=32)
+def _location_geometry(location: str) -> Optional[ee.Geometry]:
+    """Earth Engine rectangle for a location name, built once per distinct name"""
+    location_info = _LOCATIONS.get(location.lower().strip())
+    if location_info is None:
+        return None
+    # Create Earth Engine rectangle geometry
+    return ee.Geometry.Rectangle(location_info["bounds"])
+
+
+def _initialize_ee(service_account_key: Optional[str] = None):
+    """Initialize Earth Engine against the high-volume endpoint"""
+    if service_account_key:
+        credentials = ee.ServiceAccountCredentials(
+            email=None,  # Will be read from key file
+            key_file=service_account_key
+        )
+        ee.Initialize(credentials, opt_url=HIGH_VOLUME_URL)
+    else:
+        ee.Initialize(opt_url=HIGH_VOLUME_URL)
+
+
+def _sensor_collection(sensor: str, geometry: ee.Geometry, start_str: str, end_str: str) -> ee.ImageCollection:
+    """Filtered collection for a sensor, sorted so the wanted image comes first"""
+    if sensor == 'Sentinel-2':
+        return (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
+                .filterDate(start_str, end_str)
+                .filterBounds(geometry)
+                .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20))
+                .sort('CLOUDY_PIXEL_PERCENTAGE'))
+    
+    return (ee.ImageCollection('COPERNICUS/S1_GRD')
+            .filterDate(start_str, end_str)
+            .filterBounds(geometry)
+            .filter(ee.Filter.eq('instrumentMode', 'IW'))
+            .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VV'))
+            .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VH'))
+            .sort('system:time_start', False))
+
+
+@lru_cache(maxsize=64)
+def _resolve_collection(bounds: Tuple[float, ...], start_str: str, end_str: str, sensor: str) -> Optional[Dict]:
+    """
+    Resolve a sensor query to its image id and metadata. The date range is
+    day-granular, so repeat queries for a location within a day hit the cache.
+    Returns None when the collection is empty.
+    """
+    collection = _sensor_collection(sensor, ee.Geometry.Rectangle(list(bounds)), start_str, end_str)
+    collection_size = collection.size()
+    first_image = collection.first()
+    
+    # Emptiness check, image id and properties in one round trip; the If keeps
+    # the server from touching first() when the collection is empty
+    image_info = ee.Dictionary(ee.Algorithms.If(
+        collection_size.gt(0),
+        first_image.toDictionary(SENSOR_PROPERTIES[sensor]).set('id', first_image.id()),
+        ee.Dictionary()
+    )).set('collection_size', collection_size).getInfo()
+    
+    if image_info['collection_size'] == 0:
+        return None
+    return image_info
+
+
+def _clay_cache_path(location: str, s2_data: Optional[Dict], s1_data: Optional[Dict]) -> Path:
+    """Pickle path for a location's Clay data, keyed on the image dates used"""
+    location_key = location.lower().replace(' ', '_').replace(',', '')
+    s2_date = s2_data['date'].strftime('%Y%m%d') if s2_data else 'none'
+    s1_date = s1_data['date'].strftime('%Y%m%d') if s1_data else 'none'
+    return GEE_CACHE_DIR / f"{location_key}_{s2_date}_{s1_date}.pkl"
+
+
+def geometry_bounds(geometry: ee.Geometry) -> List[float]:
+    """[min_lon, min_lat, max_lon, max_lat] of a client-side geometry, without a server call"""
+    ring = geometry.toGeoJSON()['coordinates'][0]
+    lons = [point[0] for point in ring]
+    lats = [point[1] for point in ring]
+    return [min(lons), min(lats), max(lons), max(lats)]
+
 
 class GoogleEarthEngineManager:
     """
@@ -39,21 +189,20 @@ class GoogleEarthEngineManager:
         try:
             if self.service_account_key:
                 # Service account authentication (for production)
-                credentials = ee.ServiceAccountCredentials(
-                    email=None,  # Will be read from key file
-                    key_file=self.service_account_key
-                )
-                ee.Initialize(credentials)
+                _initialize_ee(self.service_account_key)
                 print("✅ Google Earth Engine authenticated via service account")
             else:
                 # Interactive authentication (for development)
                 try:
-                    ee.Initialize()
+                    _initialize_ee()
                     print("✅ Google Earth Engine authenticated")
                 except Exception:
-                    print("🔑 Authenticating Google Earth Engine...")
+                    if EE_CREDENTIALS_PATH.exists():
+                        print("🔑 Saved Earth Engine credentials were rejected, re-authenticating...")
+                    else:
+                        print(f"🔑 No saved credentials at {EE_CREDENTIALS_PATH}, authenticating Google Earth Engine...")
                     ee.Authenticate()
-                    ee.Initialize()
+                    _initialize_ee()
                     print("✅ Google Earth Engine authentication complete")
             
             self.is_authenticated = True
@@ -75,51 +224,11 @@ class GoogleEarthEngineManager:
         Convert location name to Earth Engine geometry
         In production, integrate with geocoding service
         """
-        # Predefined coastal locations with precise coordinates
-        locations = {
-            "mumbai coastal area, india": {
-                "bounds": [72.7, 18.85, 72.95, 19.05],
-                "center": [72.825, 18.95]
-            },
-            "miami beach, florida, usa": {
-                "bounds": [-80.25, 25.65, -80.05, 25.85],
-                "center": [-80.15, 25.75]
-            },
-            "great barrier reef, australia": {
-                "bounds": [145.0, -16.8, 146.5, -15.5],
-                "center": [145.75, -16.15]
-            },
-            "maldives coral atolls": {
-                "bounds": [72.8, 3.0, 74.2, 4.5],
-                "center": [73.5, 3.75]
-            },
-            "california coast, usa": {
-                "bounds": [-122.8, 36.2, -121.8, 37.2],
-                "center": [-122.3, 36.7]
-            },
-            "chennai coast, india": {
-                "bounds": [80.15, 12.95, 80.35, 13.15],
-                "center": [80.25, 13.05]
-            },
-            "rio de janeiro coast, brazil": {
-                "bounds": [-43.8, -23.2, -43.0, -22.6],
-                "center": [-43.4, -22.9]
-            },
-            "sydney harbour, australia": {
-                "bounds": [151.0, -34.0, 151.5, -33.6],
-                "center": [151.25, -33.8]
-            }
-        }
-        
-        location_key = location.lower().strip()
-        if location_key in locations:
-            bounds = locations[location_key]["bounds"]
-            # Create Earth Engine rectangle geometry
-            return ee.Geometry.Rectangle(bounds)
-        else:
+        geometry = _location_geometry(location)
+        if geometry is None:
             print(f"⚠️  Location '{location}' not found in predefined list")
-            print("Available locations:", list(locations.keys()))
-            return None
+            print("Available locations:", list(_LOCATIONS.keys()))
+        return geometry
     
     def get_latest_sentinel2_data(self, geometry: ee.Geometry, days_back: int = 30) -> Optional[Dict]:
         """
@@ -143,24 +252,15 @@ class GoogleEarthEngineManager:
             
             print(f"🛰️  Searching Sentinel-2 data from {start_str} to {end_str}")
             
-            # Sentinel-2 collection
-            s2_collection = (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
-                           .filterDate(start_str, end_str)
-                           .filterBounds(geometry)
-                           .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20))
-                           .sort('CLOUDY_PIXEL_PERCENTAGE'))
-            
             # Get the least cloudy image
-            if s2_collection.size().getInfo() == 0:
+            image_info = _resolve_collection(tuple(geometry_bounds(geometry)), start_str, end_str, 'Sentinel-2')
+            if image_info is None:
                 print("❌ No cloud-free Sentinel-2 imagery found in date range")
                 return None
             
-            latest_image = s2_collection.first()
-            
-            # Get image metadata
-            image_info = latest_image.getInfo()
-            image_date = datetime.fromtimestamp(image_info['properties']['system:time_start'] / 1000)
-            cloud_cover = image_info['properties']['CLOUDY_PIXEL_PERCENTAGE']
+            latest_image = ee.Image(image_info['id'])
+            image_date = datetime.fromtimestamp(image_info['system:time_start'] / 1000)
+            cloud_cover = image_info['CLOUDY_PIXEL_PERCENTAGE']
             
             print(f"📅 Found image from: {image_date.strftime('%Y-%m-%d')}")
             print(f"☁️  Cloud coverage: {cloud_cover:.1f}%")
@@ -179,7 +279,7 @@ class GoogleEarthEngineManager:
                 'bands': bands,
                 'geometry': geometry,
                 'satellite': 'Sentinel-2',
-                'collection_size': s2_collection.size().getInfo()
+                'collection_size': image_info['collection_size']
             }
             
         except Exception as e:
@@ -204,24 +304,13 @@ class GoogleEarthEngineManager:
             
             print(f"🛰️  Searching Sentinel-1 data from {start_str} to {end_str}")
             
-            # Sentinel-1 collection
-            s1_collection = (ee.ImageCollection('COPERNICUS/S1_GRD')
-                           .filterDate(start_str, end_str)
-                           .filterBounds(geometry)
-                           .filter(ee.Filter.eq('instrumentMode', 'IW'))
-                           .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VV'))
-                           .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VH'))
-                           .sort('system:time_start', False))
-            
-            if s1_collection.size().getInfo() == 0:
+            image_info = _resolve_collection(tuple(geometry_bounds(geometry)), start_str, end_str, 'Sentinel-1')
+            if image_info is None:
                 print("❌ No Sentinel-1 imagery found in date range")
                 return None
             
-            latest_image = s1_collection.first()
-            
-            # Get image metadata
-            image_info = latest_image.getInfo()
-            image_date = datetime.fromtimestamp(image_info['properties']['system:time_start'] / 1000)
+            latest_image = ee.Image(image_info['id'])
+            image_date = datetime.fromtimestamp(image_info['system:time_start'] / 1000)
             
             print(f"📅 Found SAR image from: {image_date.strftime('%Y-%m-%d')}")
             
@@ -237,124 +326,171 @@ class GoogleEarthEngineManager:
                 'bands': ['VV', 'VH'],
                 'geometry': geometry,
                 'satellite': 'Sentinel-1',
-                'collection_size': s1_collection.size().getInfo()
+                'collection_size': image_info['collection_size']
             }
             
         except Exception as e:
             print(f"❌ Error fetching Sentinel-1 data: {e}")
             return None
     
-    def extract_pixel_data(self, ee_image: ee.Image, geometry: ee.Geometry, scale: int = 10) -> Dict:
+    def _download_raster(self, ee_image: ee.Image, geometry: ee.Geometry, bands: List[str]) -> np.ndarray:
+        """
+        Fetch the image as a CLAY_TILE_SIZE x CLAY_TILE_SIZE raster over the AOI.
+        Returns a structured array with one field per band.
+        
+        The grid is fixed, so even the largest AOI stays one small request
+        far below the computePixels size limit.
+        """
+        return self._compute_pixels(ee_image, geometry_bounds(geometry), bands, CLAY_TILE_SIZE)
+    
+    def _compute_pixels(self, ee_image: ee.Image, bounds: List[float], bands: List[str], size: int) -> np.ndarray:
+        """Compute a size x size raster over bounds with one computePixels request"""
+        min_lon, min_lat, max_lon, max_lat = bounds
+        return ee.data.computePixels({
+            'expression': ee_image,
+            'bandIds': bands,
+            'fileFormat': 'NUMPY_NDARRAY',
+            'grid': {
+                'dimensions': {'width': size, 'height': size},
+                # North-up grid anchored at the top-left corner of the bounds
+                'affineTransform': {
+                    'scaleX': (max_lon - min_lon) / size,
+                    'shearX': 0,
+                    'translateX': min_lon,
+                    'shearY': 0,
+                    'scaleY': -(max_lat - min_lat) / size,
+                    'translateY': max_lat
+                },
+                'crsCode': 'EPSG:4326'
+            }
+        })
+    
+    def compute_index_statistics(self, satellite_data: Dict, scale: int = 10) -> Dict:
         """
-        Extract pixel values from Earth Engine image to numpy arrays
+        Calculate coastal index statistics server-side in a single reduceRegion,
+        so only a small stats dict comes back instead of the pixel table
         
         Args:
-            ee_image: Earth Engine image
-            geometry: Area of interest
+            satellite_data: Result of get_latest_sentinel2_data / get_latest_sentinel1_data
             scale: Pixel resolution in meters
         """
+        ee_image = satellite_data['ee_image']
+        
         try:
-            # Get the image as an array
-            region = geometry.bounds()
-            
-            # Sample the image to get pixel values
-            sample = ee_image.sample(
-                region=region,
+            # For Sentinel-2 data
+            if 'B8' in satellite_data['bands']:
+                indices = ee.Image([
+                    ee_image.normalizedDifference(['B8', 'B4']).rename('NDVI'),
+                    ee_image.normalizedDifference(['B3', 'B8']).rename('NDWI'),
+                    ee_image.normalizedDifference(['B3', 'B11']).rename('MNDWI'),
+                    ee_image.expression('(B2 + B3) / (B4 + B8)', {
+                        'B2': ee_image.select('B2'),
+                        'B3': ee_image.select('B3'),
+                        'B4': ee_image.select('B4'),
+                        'B8': ee_image.select('B8')
+                    }).rename('CWQI')
+                ])
+            # For Sentinel-1 SAR data
+            else:
+                vv = ee_image.select('VV')
+                vh = ee_image.select('VH')
+                indices = ee.Image([
+                    vv.divide(vh).rename('SAR_Water'),
+                    vv.subtract(vh).rename('Roughness')
+                ])
+            
+            reducer = (ee.Reducer.mean()
+                       .combine(ee.Reducer.stdDev(), '', True)
+                       .combine(ee.Reducer.minMax(), '', True))
+            stats = indices.reduceRegion(
+                reducer=reducer,
+                geometry=satellite_data['geometry'],
                 scale=scale,
-                numPixels=10000,  # Limit for processing
-                geometries=True
-            )
-            
-            # Convert to pandas DataFrame
-            sample_data = sample.getInfo()
-            
-            if not sample_data['features']:
-                print("❌ No pixel data extracted")
-                return None
-            
-            # Extract coordinates and band values
-            pixel_data = []
-            for feature in sample_data['features']:
-                properties = feature['properties']
-                coordinates = feature['geometry']['coordinates']
-                
-                pixel_info = {
-                    'longitude': coordinates[0],
-                    'latitude': coordinates[1]
-                }
-                pixel_info.update(properties)
-                pixel_data.append(pixel_info)
+                bestEffort=True
+            ).getInfo()
             
-            df = pd.DataFrame(pixel_data)
-            
-            print(f"✅ Extracted {len(df)} pixel samples")
+            index_names = sorted({key.rsplit('_', 1)[0] for key in stats})
+            print(f"✅ Calculated {len(index_names)} coastal indices")
             
             return {
-                'dataframe': df,
-                'pixel_count': len(df),
-                'bands': [col for col in df.columns if col not in ['longitude', 'latitude']],
-                'bounds': {
-                    'min_lon': df['longitude'].min(),
-                    'max_lon': df['longitude'].max(),
-                    'min_lat': df['latitude'].min(),
-                    'max_lat': df['latitude'].max()
+                index_name: {
+                    'mean': stats.get(f'{index_name}_mean'),
+                    'std': stats.get(f'{index_name}_stdDev'),
+                    'min': stats.get(f'{index_name}_min'),
+                    'max': stats.get(f'{index_name}_max')
                 }
+                for index_name in index_names
             }
             
         except Exception as e:
-            print(f"❌ Error extracting pixel data: {e}")
-            return None
+            print(f"❌ Error calculating indices: {e}")
+            return {}
     
-    def calculate_coastal_indices(self, pixel_data: Dict) -> Dict:
+    def get_index_statistics_batch(self, locations: List[str], days_back: int = 30) -> Dict[str, Dict]:
         """
-        Calculate coastal monitoring indices from satellite data
+        Mean NDVI/NDWI/MNDWI for several predefined locations, computed
+        server-side with FeatureCollection.map and fetched in one getInfo
+        
+        Args:
+            locations: Location names to sweep
+            days_back: Number of days to look back for imagery
         """
-        df = pixel_data['dataframe']
-        indices = {}
+        if not self.is_authenticated:
+            print("❌ Google Earth Engine not authenticated")
+            return {}
+        
+        location_keys = {}
+        for location in locations:
+            location_key = location.lower().strip()
+            if location_key in _LOCATIONS:
+                location_keys[location_key] = location
+            else:
+                print(f"⚠️  Location '{location}' not found in predefined list")
+        
+        if not location_keys:
+            return {}
         
         try:
-            # For Sentinel-2 data
-            if 'B4' in df.columns and 'B8' in df.columns:
-                # NDVI (Normalized Difference Vegetation Index)
-                indices['NDVI'] = (df['B8'] - df['B4']) / (df['B8'] + df['B4'])
-                
-                # NDWI (Normalized Difference Water Index)
-                if 'B3' in df.columns:
-                    indices['NDWI'] = (df['B3'] - df['B8']) / (df['B3'] + df['B8'])
-                
-                # MNDWI (Modified NDWI for water detection)
-                if 'B11' in df.columns:
-                    indices['MNDWI'] = (df['B3'] - df['B11']) / (df['B3'] + df['B11'])
-                
-                # Coastal Water Quality Index
-                if 'B2' in df.columns and 'B3' in df.columns:
-                    indices['CWQI'] = (df['B2'] + df['B3']) / (df['B4'] + df['B8'])
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=days_back)
             
-            # For Sentinel-1 SAR data
-            if 'VV' in df.columns and 'VH' in df.columns:
-                # SAR-based water detection
-                indices['SAR_Water'] = df['VV'] / df['VH']
-                
-                # Roughness index
-                indices['Roughness'] = df['VV'] - df['VH']
+            aois = ee.FeatureCollection([
+                ee.Feature(ee.Geometry.Rectangle(_LOCATIONS[location_key]["bounds"]), {'name': location_key})
+                for location_key in location_keys
+            ])
+            
+            # Least cloudy pixels on top of the mosaic
+            s2_mosaic = (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
+                         .filterDate(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+                         .filterBounds(aois)
+                         .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20))
+                         .sort('CLOUDY_PIXEL_PERCENTAGE', False)
+                         .mosaic())
+            indices = ee.Image([
+                s2_mosaic.normalizedDifference(['B8', 'B4']).rename('NDVI'),
+                s2_mosaic.normalizedDifference(['B3', 'B8']).rename('NDWI'),
+                s2_mosaic.normalizedDifference(['B3', 'B11']).rename('MNDWI')
+            ])
+            
+            def compute(feature):
+                stats = indices.reduceRegion(
+                    reducer=ee.Reducer.mean(),
+                    geometry=feature.geometry(),
+                    scale=10,
+                    bestEffort=True
+                )
+                return feature.set(stats)
             
-            print(f"✅ Calculated {len(indices)} coastal indices")
+            features = aois.map(compute).getInfo()['features']
+            print(f"✅ Calculated coastal indices for {len(features)} locations")
             
             return {
-                'indices': indices,
-                'statistics': {
-                    index_name: {
-                        'mean': values.mean(),
-                        'std': values.std(),
-                        'min': values.min(),
-                        'max': values.max()
-                    }
-                    for index_name, values in indices.items()
-                }
+                location_keys[feature['properties'].pop('name')]: feature['properties']
+                for feature in features
             }
             
         except Exception as e:
-            print(f"❌ Error calculating indices: {e}")
+            print(f"❌ Error calculating batch indices: {e}")
             return {}
     
     def convert_to_clay_format(self, s2_data: Dict, s1_data: Dict, location: str) -> Dict:
@@ -364,66 +500,33 @@ class GoogleEarthEngineManager:
         print("🔄 Converting GEE data to Clay v1.5 format...")
         
         try:
-            # Extract pixel data for both satellites
-            s2_pixels = None
-            s1_pixels = None
-            
-            if s2_data:
-                s2_pixels = self.extract_pixel_data(s2_data['ee_image'], s2_data['geometry'])
+            # Download the real rasters for both satellites concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                s2_future = s1_future = None
+                if s2_data:
+                    s2_future = executor.submit(self._download_raster, s2_data['ee_image'], s2_data['geometry'], s2_data['bands'])
+                if s1_data:
+                    s1_future = executor.submit(self._download_raster, s1_data['ee_image'], s1_data['geometry'], s1_data['bands'])
                 
-            if s1_data:
-                s1_pixels = self.extract_pixel_data(s1_data['ee_image'], s1_data['geometry'])
+                s2_array = s2_future.result() if s2_future else None
+                s1_array = s1_future.result() if s1_future else None
             
-            # Create synthetic raster arrays for Clay processing
-            # In production, you would export the actual raster data
             clay_bands = {}
             
-            if s2_pixels:
-                df_s2 = s2_pixels['dataframe']
-                # Create synthetic 256x256 arrays based on real statistics
-                for band in ['B2', 'B3', 'B4', 'B8', 'B11', 'B12']:
-                    if band in df_s2.columns:
-                        mean_val = df_s2[band].mean() / 10000.0  # Sentinel-2 scaling
-                        std_val = df_s2[band].std() / 10000.0
-                        
-                        # Create realistic array based on real data statistics
-                        synthetic_array = np.random.normal(mean_val, std_val, (256, 256))
-                        synthetic_array = np.clip(synthetic_array, 0, 1)
-                        
-                        # Map to Clay expected bands
-                        band_mapping = {
-                            'B2': 'blue',
-                            'B3': 'green', 
-                            'B4': 'red',
-                            'B8': 'nir',
-                            'B11': 'swir1',
-                            'B12': 'swir2'
-                        }
-                        
-                        if band in band_mapping:
-                            clay_bands[band_mapping[band]] = synthetic_array
-            
-            if s1_pixels:
-                df_s1 = s1_pixels['dataframe']
+            if s2_array is not None:
+                for band, clay_band in S2_CLAY_BANDS.items():
+                    # Sentinel-2 scaling
+                    clay_bands[clay_band] = np.clip(s2_array[band] / 10000.0, 0, 1)
+            
+            if s1_array is not None:
                 for band in ['VV', 'VH']:
-                    if band in df_s1.columns:
-                        mean_val = df_s1[band].mean()
-                        std_val = df_s1[band].std()
-                        
-                        # SAR data is in dB, convert to linear scale
-                        linear_mean = 10 ** (mean_val / 10)
-                        linear_std = 10 ** (std_val / 10)
-                        
-                        synthetic_array = np.random.normal(linear_mean, linear_std, (256, 256))
-                        synthetic_array = np.clip(synthetic_array, 0, 1)
-                        
-                        clay_bands[f'sar_{band.lower()}'] = synthetic_array
+                    # SAR data is in dB, convert to linear scale
+                    clay_bands[f'sar_{band.lower()}'] = np.clip(10 ** (s1_array[band] / 10), 0, 1)
             
             # Calculate coastal indices
             coastal_indices = {}
-            if s2_pixels:
-                indices_data = self.calculate_coastal_indices(s2_pixels)
-                coastal_indices.update(indices_data.get('statistics', {}))
+            if s2_data:
+                coastal_indices = self.compute_index_statistics(s2_data)
             
             # Create Clay-compatible data structure
             clay_data = {
@@ -439,8 +542,8 @@ class GoogleEarthEngineManager:
                     's2_cloud_cover': s2_data['cloud_cover'] if s2_data else None,
                     's2_date': s2_data['date'].isoformat() if s2_data else None,
                     's1_date': s1_data['date'].isoformat() if s1_data else None,
-                    'pixel_samples_s2': s2_pixels['pixel_count'] if s2_pixels else 0,
-                    'pixel_samples_s1': s1_pixels['pixel_count'] if s1_pixels else 0,
+                    'pixel_samples_s2': s2_array.size if s2_array is not None else 0,
+                    'pixel_samples_s1': s1_array.size if s1_array is not None else 0,
                     'coastal_indices': coastal_indices
                 }
             }
@@ -454,16 +557,21 @@ class GoogleEarthEngineManager:
             print(f"❌ Error converting to Clay format: {e}")
             return None
     
-    def create_visualization_map(self, location: str, s2_data: Dict, s1_data: Dict) -> str:
+    def create_visualization_map(self, location: str, s2_data: Dict, s1_data: Dict,
+                                 geometry: Optional[ee.Geometry] = None) -> str:
         """
         Create an interactive map showing the satellite data
+        
+        Args:
+            geometry: The location's geometry, if the caller already has it
         """
         try:
-            geometry = self.get_location_bounds(location)
-            center = geometry.centroid().coordinates().getInfo()
+            if geometry is None:
+                geometry = self.get_location_bounds(location)
+            min_lon, min_lat, max_lon, max_lat = geometry_bounds(geometry)
             
             # Create map centered on the location
-            m = geemap.Map(center=[center[1], center[0]], zoom=10)
+            m = geemap.Map(center=[(min_lat + max_lat) / 2, (min_lon + max_lon) / 2], zoom=10)
             
             # Add Sentinel-2 data if available
             if s2_data:
@@ -498,7 +606,8 @@ class GoogleEarthEngineManager:
             
             # Save map
             map_file = f"coastal_map_{location.replace(' ', '_').replace(',', '')}.html"
-            m.to_html(map_file)
+            # Render to a string and write the whole page in one call
+            Path(map_file).write_text(m.to_html(), encoding='utf-8')
             
             print(f"🗺️  Interactive map saved: {map_file}")
             
@@ -559,20 +668,33 @@ class RealTimeClayMonitor:
             
             # Step 2: Fetch real satellite data
             print(f"\n2️⃣  FETCHING REAL SATELLITE DATA")
-            s2_data = self.gee_manager.get_latest_sentinel2_data(geometry, days_back)
-            s1_data = self.gee_manager.get_latest_sentinel1_data(geometry, days_back)
+            # The two sensor lookups are independent network waits, so overlap them
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                s2_future = executor.submit(self.gee_manager.get_latest_sentinel2_data, geometry, days_back)
+                s1_future = executor.submit(self.gee_manager.get_latest_sentinel1_data, geometry, days_back)
+                s2_data, s1_data = s2_future.result(), s1_future.result()
             
             if not s2_data and not s1_data:
                 print("❌ No satellite data available for this location")
                 return None
             
-            # Step 3: Convert to Clay format
+            # Step 3: Convert to Clay format, reusing a previous conversion of the same imagery
             print(f"\n3️⃣  CONVERTING TO CLAY v1.5 FORMAT")
-            clay_data = self.gee_manager.convert_to_clay_format(s2_data, s1_data, location)
-            
-            if not clay_data:
-                print("❌ Failed to convert data to Clay format")
-                return None
+            cache_file = _clay_cache_path(location, s2_data, s1_data)
+            if cache_file.exists():
+                with open(cache_file, 'rb') as f:
+                    clay_data = pickle.load(f)
+                print(f"💾 Using cached Clay data: {cache_file}")
+            else:
+                clay_data = self.gee_manager.convert_to_clay_format(s2_data, s1_data, location)
+                
+                if not clay_data:
+                    print("❌ Failed to convert data to Clay format")
+                    return None
+                
+                GEE_CACHE_DIR.mkdir(exist_ok=True)
+                with open(cache_file, 'wb') as f:
+                    pickle.dump(clay_data, f, protocol=pickle.HIGHEST_PROTOCOL)
             
             # Step 4: Process with Clay v1.5
             print(f"\n4️⃣  PROCESSING WITH CLAY v1.5")
@@ -590,7 +712,7 @@ class RealTimeClayMonitor:
             
             # Step 7: Create visualization
             print(f"\n7️⃣  CREATING INTERACTIVE VISUALIZATION")
-            map_file = self.gee_manager.create_visualization_map(location, s2_data, s1_data)
+            map_file = self.gee_manager.create_visualization_map(location, s2_data, s1_data, geometry)
             
             # Compile results
             result = {
@@ -697,6 +819,31 @@ class RealTimeClayMonitor:
                 'real_time_data': True
             }
         }
+    
+    def monitor_locations_batch(self, locations: List[str], days_back: int = 30) -> Dict:
+        """
+        Quick index sweep over many predefined locations with a single Earth
+        Engine request, without the per-location Clay pipeline
+        """
+        print(f"\n🌍 BATCH INDEX SWEEP: {len(locations)} locations")
+        print("=" * 70)
+        
+        results = self.gee_manager.get_index_statistics_batch(locations, days_back)
+        
+        for location, stats in results.items():
+            ndvi = stats.get('NDVI')
+            ndvi_text = f"{ndvi:.3f}" if ndvi is not None else "n/a"
+            print(f"📍 {location}: NDVI {ndvi_text}")
+        
+        return {
+            'batch_results': results,
+            'summary': {
+                'total_locations': len(locations),
+                'successful_monitoring': len(results),
+                'monitoring_timestamp': datetime.now().isoformat(),
+                'real_time_data': True
+            }
+        }
 
 
 # Production-ready example usage
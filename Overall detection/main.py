@@ -3,10 +3,16 @@ Coastal Alert System using Clay v1.5 Geospatial Foundation Model
 A comprehensive system for monitoring coastal threats and environmental changes
 """
 
+import os
 import torch
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+import matplotlib
+
+# Headless runs (API servers, batch reports) render with Agg and skip the GUI event loop
+HEADLESS = os.environ.get('COASTAL_HEADLESS') == '1'
+if HEADLESS:
+    matplotlib.use('Agg')
+
 from PIL import Image
 import requests
 import json
@@ -86,15 +92,17 @@ class ClayCoastalMonitor:
             date = datetime.now()
             
         # Simulate multi-spectral data (bands)
-        np.random.seed(42)  # For reproducible demo
+        # Local generator for a reproducible demo; reseeding the global RNG would
+        # interleave draws when several locations are simulated on threads at once
+        rng = np.random.default_rng(42)
         
         # Simulate Sentinel-2 bands (RGB + NIR + SWIR)
         bands = {
-            'red': np.random.rand(256, 256) * 0.3 + 0.1,
-            'green': np.random.rand(256, 256) * 0.4 + 0.2,
-            'blue': np.random.rand(256, 256) * 0.6 + 0.3,
-            'nir': np.random.rand(256, 256) * 0.8 + 0.1,  # Near-infrared
-            'swir': np.random.rand(256, 256) * 0.5 + 0.1,  # Short-wave infrared
+            'red': rng.random((256, 256)) * 0.3 + 0.1,
+            'green': rng.random((256, 256)) * 0.4 + 0.2,
+            'blue': rng.random((256, 256)) * 0.6 + 0.3,
+            'nir': rng.random((256, 256)) * 0.8 + 0.1,  # Near-infrared
+            'swir': rng.random((256, 256)) * 0.5 + 0.1,  # Short-wave infrared
         }
         
         # Add coastal features to the simulation
@@ -110,7 +118,7 @@ class ClayCoastalMonitor:
             'bands': bands,
             'metadata': {
                 'sensor': 'Sentinel-2',
-                'cloud_cover': np.random.randint(5, 25),
+                'cloud_cover': int(rng.integers(5, 25)),
                 'resolution': '10m'
             }
         }
@@ -255,6 +263,9 @@ class ClayCoastalMonitor:
     
     def visualize_analysis(self, satellite_data, embeddings_data, threats, save_path=None):
         """Create visualization of the coastal analysis"""
+        # pyplot is only needed here; importing it lazily keeps API/monitor startup light
+        import matplotlib.pyplot as plt
+
         fig, axes = plt.subplots(2, 3, figsize=(18, 12))
         fig.suptitle(f"Coastal Analysis Report - {satellite_data['location']}", fontsize=16, fontweight='bold')
         
@@ -304,8 +315,8 @@ class ClayCoastalMonitor:
         if threats:
             threat_names = list(threats.keys())
             threat_probs = [threats[name]['probability'] for name in threat_names]
-            threat_colors = ['red' if threats[name]['severity'] == 'high' else 'orange' 
-                           for name in threat_names]
+            severities = np.array([threats[name]['severity'] for name in threat_names])
+            threat_colors = np.where(severities == 'high', 'red', 'orange')
             
             bars = axes[1, 1].bar(threat_names, threat_probs, color=threat_colors)
             axes[1, 1].set_title('Threat Probabilities')
@@ -344,11 +355,13 @@ class ClayCoastalMonitor:
         
         plt.tight_layout()
         
+        # A saved report doesn't need an interactive render as well
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            fig.savefig(save_path, dpi=300, bbox_inches='tight')
             print(f"📊 Visualization saved to: {save_path}")
-        
-        plt.show()
+        elif not HEADLESS:
+            plt.show()
+        plt.close(fig)
     
     def monitor_location(self, location, generate_report=True, visualize=True):
         """
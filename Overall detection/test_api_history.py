@@ -0,0 +1,47 @@
+"""
+Tests for the monitoring history endpoints of the Clay v1.5 API
+"""
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import api
+
+
+def fake_monitor_location(location, generate_report=True, visualize=True):
+    """Monitoring result shaped like ClayCoastalMonitor's, with numpy scalars"""
+    return {
+        "threats": {
+            "erosion": {"probability": np.float64(0.83), "severity": "high"}
+        },
+        "report": {
+            "alert_id": f"ALERT_{location}",
+            "timestamp": "2024-01-01T00:00:00",
+            "location": location,
+            "analysis_confidence": np.float64(0.92),
+            "recommendations": ["Increase monitoring frequency"]
+        }
+    }
+
+
+def test_history_after_batch_monitor(monkeypatch):
+    monkeypatch.setattr(api.monitor, "monitor_location", fake_monitor_location)
+    monkeypatch.setattr(api, "monitoring_history", api.deque(maxlen=1000))
+    monkeypatch.setattr(api, "active_alerts", api.deque(maxlen=200))
+    client = TestClient(api.app)
+    
+    # Background tasks finish before TestClient returns the response
+    response = client.post("/batch-monitor", json=["Mumbai Coastal Area, India", "Chennai Coast, India"])
+    assert response.status_code == 200
+    
+    response = client.get("/history")
+    assert response.status_code == 200
+    history = response.json()
+    assert [record["location"] for record in history] == ["Mumbai Coastal Area, India", "Chennai Coast, India"]
+    assert history[0]["confidence"] == 0.92
+    assert history[0]["threats"][0]["probability"] == 0.83
+
+
+def test_history_rejects_non_positive_limit():
+    client = TestClient(api.app)
+    assert client.get("/history", params={"limit": 0}).status_code == 422
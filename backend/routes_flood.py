@@ -4,8 +4,10 @@ from models import FloodDetectionRequest, FloodAlert
 from database import flood_alerts_collection, users_collection
 from routes_auth import get_current_user
 from datetime import datetime, timedelta
+from typing import List
 from bson import ObjectId
 import numpy as np
+import asyncio
 import sys
 import os
 from notifications import send_flood_alert_email
@@ -191,6 +193,31 @@ async def get_current_flood_risk(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to analyze flood risk: {str(e)}")
 
+@router.post("/batch-current-risk")
+async def get_batch_current_flood_risk(
+    locations: List[FloodDetectionRequest],
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get current flood risk for several locations in one request, without saving alerts
+    """
+    try:
+        # Analyze every location concurrently on worker threads
+        analyses = await asyncio.gather(*[
+            asyncio.to_thread(analyze_flood_risk_simple, location.latitude, location.longitude)
+            for location in locations
+        ])
+        return [
+            {
+                "location": f"({location.latitude:.4f}, {location.longitude:.4f})",
+                "locationName": location.locationName,
+                "analysis": analysis
+            }
+            for location, analysis in zip(locations, analyses)
+        ]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to analyze flood risk: {str(e)}")
+
 def analyze_flood_risk_gee(latitude: float, longitude: float):
     """
     Real GEE-based flood risk analysis using actual satellite and environmental data
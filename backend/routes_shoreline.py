@@ -35,30 +35,21 @@ async def analyze_shoreline(
         
         # Convert coordinates to shoreline positions (simplified for demo)
         # In a real implementation, you'd use actual satellite data or historical measurements
-        shoreline_positions = []
-        timestamps = []
         
         # Generate synthetic shoreline change data based on the drawn path
         # This simulates what would come from actual satellite imagery analysis
         base_position = 100.0  # meters from reference point
         start_date = datetime(2020, 1, 1)
+        months = np.arange(12)  # 12 months of data
         
-        for i in range(12):  # 12 months of data
-            # Add trend (gradual erosion)
-            trend = -0.3 * i  # 0.3m erosion per month
-            
-            # Add seasonal variation
-            seasonal = 1.5 * np.sin(2 * np.pi * i / 12)  # Annual cycle
-            
-            # Add random noise
-            noise = np.random.normal(0, 0.8)
-            
-            position = base_position + trend + seasonal + noise
-            shoreline_positions.append(position)
-            
-            # Add timestamp
-            timestamp = start_date + timedelta(days=30*i)
-            timestamps.append(timestamp)
+        # Trend (0.3m erosion per month) + annual seasonal cycle + random noise
+        shoreline_positions = (
+            base_position
+            - 0.3 * months
+            + 1.5 * np.sin(2 * np.pi * months / 12)
+            + np.random.default_rng().normal(0, 0.8, size=months.shape)
+        ).tolist()
+        timestamps = [start_date + timedelta(days=30 * i) for i in range(len(months))]
         
         # Analyze coastal threats using the coastal detection model
         threat_analysis = analyze_coastal_threats(shoreline_positions, timestamps)